@@ -0,0 +1,5 @@
+from client.async_client import AsyncDetectorClient
+from client.channels import ChannelPool, DEFAULT_CHANNEL_OPTIONS
+from client.histogram import LatencyHistogram
+from client.policies import BatchPolicy, HedgePolicy, RetryPolicy, HEDGED_METHODS, RETRYABLE_CODES
+from client.sync_client import DetectorClient
@@ -0,0 +1,323 @@
+import asyncio
+import collections
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import grpc
+
+from proto import inference_pb2
+from client.channels import ChannelPool
+from client.histogram import LatencyHistogram
+from client.policies import BatchPolicy, HedgePolicy, RetryPolicy
+
+def rpc_error(code: grpc.StatusCode, details: str) -> grpc.aio.AioRpcError:
+    """Helper function to report client-side failures like server errors, so callers handle one exception type"""
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details=details)
+
+class PredictBatcher:
+    def __init__(self, policy: BatchPolicy,
+                 send: Callable[[List[str], float], Awaitable[Sequence[inference_pb2.BatchPredictResult]]],
+                 retry: Optional[Callable[[str, float, grpc.RpcError], Awaitable[List[str]]]] = None):
+        """
+        Initialize a collector of single predict calls that are sent together as one batch.
+
+        Args:
+            policy (BatchPolicy): Batch size and waiting time limits
+            send (Callable): Coroutine function sending URLs with a deadline and returning their results
+            retry (Optional[Callable]): Coroutine function called with the URL, deadline and error of an image
+                that failed in a batch; returns its objects or raises. Errors are not retried if omitted
+        """
+        self.policy = policy
+        self.send = send
+        self.retry = retry
+        self.pending: List[Tuple[str, float, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks = set()
+
+    async def predict(self, url: str, deadline: float) -> List[str]:
+        """Add a URL to the current batch and wait for its detected objects"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((url, deadline, future))
+        if len(self.pending) >= self.policy.max_batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.policy.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        """Send the current batch now"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, float, asyncio.Future]]):
+        # Skip calls cancelled while waiting for the batch
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+        try:
+            # The batch must finish before the earliest deadline of its calls
+            results = await self.send([url for url, _, _ in batch], min(deadline for _, deadline, _ in batch))
+            if len(results) != len(batch):
+                raise rpc_error(grpc.StatusCode.INTERNAL,
+                                f"Server returned {len(results)} results for {len(batch)} images")
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        failed = []
+        for (url, deadline, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if not result.error:
+                future.set_result(list(result.objects))
+                continue
+            # Servers before result codes were added report failed images by message only
+            error = rpc_error(grpc.StatusCode.__members__.get(result.code, grpc.StatusCode.UNKNOWN), result.error)
+            if self.retry is None:
+                future.set_exception(error)
+            else:
+                failed.append((url, deadline, future, error))
+        await asyncio.gather(*(self._retry(*item) for item in failed))
+
+    async def _retry(self, url: str, deadline: float, future: asyncio.Future, error: grpc.RpcError):
+        try:
+            objects = await self.retry(url, deadline, error)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(objects)
+
+class AsyncDetectorClient:
+    def __init__(self, target: str, pool_size: int = 2, timeout: float = 30.0, retry: Optional[RetryPolicy] = None,
+                 hedge: Optional[HedgePolicy] = None, batching: Optional[BatchPolicy] = None,
+                 max_in_flight: int = 128, channel_options: Optional[Sequence[Tuple[str, object]]] = None,
+                 credentials: Optional[grpc.ChannelCredentials] = None):
+        """
+        Initialize an asyncio client of the gRPC InstanceDetector service.
+        Failed calls raise grpc.RpcError; its code() is DEADLINE_EXCEEDED when the timeout expires.
+
+        Args:
+            target (str): Server address, e.g. 'localhost:9090' or 'unix:/tmp/detector.sock'
+            pool_size (int): Number of channels, each with its own connection
+            timeout (float): Default deadline of a call in seconds, including retries
+            retry (Optional[RetryPolicy]): Retry policy, RetryPolicy() if omitted; RetryPolicy(max_attempts=1) disables retries
+            hedge (Optional[HedgePolicy]): Send hedged requests to cut tail latency, disabled if omitted
+            batching (Optional[BatchPolicy]): Combine predict() calls into BatchPredict requests, disabled if omitted
+            max_in_flight (int): Maximum number of requests sent concurrently, further calls wait
+            channel_options (Optional[Sequence[Tuple[str, object]]]): gRPC channel options, DEFAULT_CHANNEL_OPTIONS if omitted
+            credentials (Optional[grpc.ChannelCredentials]): Credentials for TLS, insecure channels if omitted
+        """
+        self.pool = ChannelPool(target, pool_size, channel_options, credentials)
+        self.timeout = timeout
+        self.retry = RetryPolicy() if retry is None else retry
+        self.hedge = hedge
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        # Latency of every call by RPC name, including retries and hedged requests
+        self.latency: Dict[str, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        self.counters = {"retries": 0, "hedges": 0, "batches": 0}
+        self.batcher = PredictBatcher(batching, self._send_batch, self._retry_failed) if batching else None
+
+    async def _call(self, method: str, request, timeout: Optional[float]):
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + (self.timeout if timeout is None else timeout)
+        try:
+            if self.hedge is None or method not in self.hedge.methods:
+                response = await self._attempts(method, request, deadline)
+            else:
+                response = await self._hedged(method, request, deadline)
+        except Exception:
+            self.latency[method].record(loop.time() - start_time, error=True)
+            raise
+        self.latency[method].record(loop.time() - start_time)
+        return response
+
+    async def _attempts(self, method: str, request, deadline: float, attempt: int = 0):
+        """
+        Send the request, retrying on retryable codes while time before the deadline is left.
+        attempt is the number of attempts already made, e.g. as part of a batch.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            attempt += 1
+            try:
+                async with self.in_flight:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise rpc_error(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline exceeded before sending")
+                    # Every attempt goes to the next channel, so a broken connection is not retried
+                    return await getattr(self.pool.stub(), method)(request, timeout=remaining)
+            except grpc.RpcError as e:
+                if not self.retry.should_retry(e.code(), attempt):
+                    raise
+                delay = self.retry.backoff(attempt)
+                if loop.time() + delay >= deadline:
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(delay)
+
+    def _hedge_delay(self, method: str) -> Optional[float]:
+        if self.hedge.delay is not None:
+            return max(self.hedge.delay, self.hedge.min_delay)
+        histogram = self.latency[method]
+        if histogram.count < self.hedge.min_samples:
+            return None
+        return max(histogram.percentile(self.hedge.percentile), self.hedge.min_delay)
+
+    async def _hedged(self, method: str, request, deadline: float):
+        """Send a second request if the first is slower than the hedge delay and return the first response"""
+        delay = self._hedge_delay(method)
+        if delay is None:
+            return await self._attempts(method, request, deadline)
+
+        tasks = {asyncio.ensure_future(self._attempts(method, request, deadline))}
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.counters["hedges"] += 1
+                tasks.add(asyncio.ensure_future(self._attempts(method, request, deadline)))
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    # Errors like an invalid image repeat on every request
+                    if not pending or error.code() not in self.retry.retryable_codes:
+                        raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send_batch(self, urls: List[str], deadline: float) -> Sequence[inference_pb2.BatchPredictResult]:
+        self.counters["batches"] += 1
+        timeout = deadline - asyncio.get_running_loop().time()
+        response = await self._call("BatchPredict", inference_pb2.BatchPredictRequest(urls=urls), timeout)
+        return response.results
+
+    async def _retry_failed(self, url: str, deadline: float, error: grpc.RpcError) -> List[str]:
+        """Retry an image that failed in a batch with Predict; the batch was its first attempt"""
+        loop = asyncio.get_running_loop()
+        if not self.retry.should_retry(error.code(), 1):
+            raise error
+        delay = self.retry.backoff(1)
+        if loop.time() + delay >= deadline:
+            raise error
+        self.counters["retries"] += 1
+        await asyncio.sleep(delay)
+        # predict() records the latency of the whole call, so the retried request is not recorded again
+        response = await self._attempts("Predict", inference_pb2.PredictRequest(url=url), deadline, attempt=1)
+        return list(response.objects)
+
+    async def predict(self, url: str, timeout: Optional[float] = None) -> List[str]:
+        """
+        Detect objects in an image, as part of a batch if batching is enabled.
+
+        Args:
+            url (str): URL of the image
+            timeout (Optional[float]): Deadline in seconds, the client's default if omitted
+
+        Returns:
+            List[str]: Labels of detected objects
+        """
+        if self.batcher is None:
+            response = await self._call("Predict", inference_pb2.PredictRequest(url=url), timeout)
+            return list(response.objects)
+
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        try:
+            objects = await self.batcher.predict(url, start_time + (self.timeout if timeout is None else timeout))
+        except Exception:
+            self.latency["Predict"].record(loop.time() - start_time, error=True)
+            raise
+        self.latency["Predict"].record(loop.time() - start_time)
+        return objects
+
+    async def predict_many(self, urls: List[str], timeout: Optional[float] = None,
+                           return_exceptions: bool = False) -> List[Union[List[str], Exception]]:
+        """
+        Detect objects in many images with all requests in flight at once (up to max_in_flight).
+
+        Args:
+            urls (List[str]): URLs of the images
+            timeout (Optional[float]): Deadline of each call in seconds
+            return_exceptions (bool): Return errors in place of results instead of raising the first one
+
+        Returns:
+            List[Union[List[str], Exception]]: Labels of detected objects for every URL, in order
+        """
+        return await asyncio.gather(*(self.predict(url, timeout) for url in urls),
+                                    return_exceptions=return_exceptions)
+
+    async def predict_with_confidence(self, url: str,
+                                      timeout: Optional[float] = None) -> List[Dict[str, Union[str, float]]]:
+        """Detect objects in an image; returns dictionaries with 'label' and 'confidence'"""
+        response = await self._call("PredictWithConfidence", inference_pb2.PredictRequest(url=url), timeout)
+        return [{"label": obj.label, "confidence": obj.confidence} for obj in response.objects]
+
+    async def predict_with_options(self, url: str, confidence_threshold: float = 0.75,
+                                   max_objects: Optional[int] = None, timeout: Optional[float] = None) -> List[str]:
+        """Detect objects in an image with a custom confidence threshold and object limit"""
+        request = inference_pb2.PredictWithOptionsRequest(url=url, confidence_threshold=confidence_threshold,
+                                                          max_objects=max_objects or 0)
+        response = await self._call("PredictWithOptions", request, timeout)
+        return list(response.objects)
+
+    async def batch_predict(self, urls: List[str], timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Detect objects in several images with one request.
+
+        Returns:
+            List[Dict]: Per URL, 'url' and either 'objects' or 'error'
+        """
+        response = await self._call("BatchPredict", inference_pb2.BatchPredictRequest(urls=urls), timeout)
+        return [{"url": result.url, "error": result.error} if result.error else
+                {"url": result.url, "objects": list(result.objects)} for result in response.results]
+
+    async def model_info(self, timeout: Optional[float] = None) -> Dict:
+        response = await self._call("GetModelInfo", inference_pb2.Empty(), timeout)
+        return {
+            "model_name": response.model_name,
+            "version": response.version,
+            "device": response.device,
+            "precision": response.precision,
+            "categories": list(response.categories)
+        }
+
+    async def health(self, timeout: Optional[float] = None) -> Dict:
+        response = await self._call("HealthCheck", inference_pb2.Empty(), timeout)
+        return {"status": response.status, "model_loaded": response.model_loaded}
+
+    def stats(self) -> Dict:
+        """
+        Client-side statistics.
+
+        Returns:
+            Dict: Latency summary by RPC name under 'latency', and retry, hedge and batch counts
+        """
+        return {"latency": {method: histogram.summary() for method, histogram in list(self.latency.items())},
+                **self.counters}
+
+    async def close(self):
+        """Send waiting batches, wait for them and close the channels"""
+        if self.batcher is not None:
+            self.batcher.flush()
+            await asyncio.gather(*self.batcher.tasks, return_exceptions=True)
+        await self.pool.close()
+
+    async def __aenter__(self) -> "AsyncDetectorClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
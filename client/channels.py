@@ -0,0 +1,49 @@
+import itertools
+from typing import List, Optional, Sequence, Tuple
+import grpc
+
+from proto import inference_pb2_grpc
+
+DEFAULT_CHANNEL_OPTIONS = [
+    # Ping idle connections so broken ones are noticed before a call is sent on them;
+    # the server accepts pings every 10 seconds, see server/grpc_server.py
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    # Channels with identical options share one connection unless each has its own subchannel pool
+    ("grpc.use_local_subchannel_pool", 1),
+    # Batch responses with many images can exceed the 4 MB default
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+]
+
+class ChannelPool:
+    def __init__(self, target: str, size: int = 2, options: Optional[Sequence[Tuple[str, object]]] = None,
+                 credentials: Optional[grpc.ChannelCredentials] = None):
+        """
+        Initialize a pool of asyncio channels, each with its own connection to the server.
+        Calls are spread over the channels round robin.
+
+        Args:
+            target (str): Server address, e.g. 'localhost:9090' or 'unix:/tmp/detector.sock'
+            size (int): Number of channels
+            options (Optional[Sequence[Tuple[str, object]]]): Channel options, DEFAULT_CHANNEL_OPTIONS if omitted
+            credentials (Optional[grpc.ChannelCredentials]): Credentials for TLS, insecure channels if omitted
+        """
+        options = list(DEFAULT_CHANNEL_OPTIONS if options is None else options)
+        if credentials is None:
+            self.channels = [grpc.aio.insecure_channel(target, options=options) for _ in range(size)]
+        else:
+            self.channels = [grpc.aio.secure_channel(target, credentials, options=options) for _ in range(size)]
+        self.stubs: List[inference_pb2_grpc.InstanceDetectorStub] = [
+            inference_pb2_grpc.InstanceDetectorStub(channel) for channel in self.channels
+        ]
+        self.counter = itertools.count()
+
+    def stub(self) -> inference_pb2_grpc.InstanceDetectorStub:
+        """Stub of the next channel"""
+        return self.stubs[next(self.counter) % len(self.stubs)]
+
+    async def close(self):
+        for channel in self.channels:
+            await channel.close()
@@ -0,0 +1,75 @@
+import math
+import threading
+from typing import Dict, List
+
+# Bucket upper bounds grow by 25% from 0.5 ms to about 70 s, so percentiles are accurate to 25%
+BUCKET_GROWTH = 1.25
+BUCKET_BOUNDS = [0.0005 * BUCKET_GROWTH ** i for i in range(54)]
+
+class LatencyHistogram:
+    """Thread-safe histogram of call latencies with percentile estimates"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, error: bool = False):
+        """
+        Record the latency of one call.
+
+        Args:
+            seconds (float): Latency of the call
+            error (bool): Whether the call failed; failed calls are counted but not part of the latencies
+        """
+        with self.lock:
+            if error:
+                self.errors += 1
+                return
+            index = 0 if seconds <= BUCKET_BOUNDS[0] else math.ceil(
+                math.log(seconds / BUCKET_BOUNDS[0], BUCKET_GROWTH))
+            self.buckets[min(index, len(BUCKET_BOUNDS))] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a latency percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile in seconds, 0 without samples
+        """
+        with self.lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(q / 100 * self.count))
+            cumulative = 0
+            for index, count in enumerate(self.buckets):
+                cumulative += count
+                if cumulative >= rank:
+                    break
+            bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+            return min(bound, self.max)
+
+    def summary(self, percentiles: List[float] = (50, 90, 95, 99)) -> Dict:
+        """
+        Summarize the recorded calls.
+
+        Returns:
+            Dict: Call and error counts, mean and max latency and percentiles in ms
+        """
+        result = {f"p{q:g}_ms": self.percentile(q) * 1000 for q in percentiles}
+        with self.lock:
+            result.update({
+                "count": self.count,
+                "errors": self.errors,
+                "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "max_ms": self.max * 1000
+            })
+        return result
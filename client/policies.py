@@ -0,0 +1,75 @@
+import random
+from typing import Iterable, Optional
+import grpc
+
+# Codes after which the same request may succeed: the server is restarting or out of image memory
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, initial_backoff: float = 0.05, max_backoff: float = 1.0,
+                 multiplier: float = 2.0, jitter: float = 0.2,
+                 retryable_codes: Iterable[grpc.StatusCode] = RETRYABLE_CODES):
+        """
+        Initialize a policy for retrying failed calls with exponential backoff.
+        Retries never extend a call beyond its deadline.
+
+        Args:
+            max_attempts (int): Maximum number of attempts including the first one, 1 disables retries
+            initial_backoff (float): Delay before the first retry in seconds
+            max_backoff (float): Upper limit of the delay in seconds
+            multiplier (float): Growth of the delay after every retry
+            jitter (float): Random relative deviation of the delay, spreads out retries of many clients
+            retryable_codes (Iterable[grpc.StatusCode]): Status codes that are retried
+        """
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retryable_codes = frozenset(retryable_codes)
+
+    def should_retry(self, code: grpc.StatusCode, attempt: int) -> bool:
+        """Whether a call that failed with code on the given attempt (starting at 1) is retried"""
+        return attempt < self.max_attempts and code in self.retryable_codes
+
+    def backoff(self, attempt: int) -> float:
+        """Delay in seconds before retrying after the given attempt"""
+        delay = min(self.initial_backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+# Single-image calls; hedging a BatchPredict would repeat the work for the whole batch
+HEDGED_METHODS = ("Predict", "PredictWithConfidence", "PredictWithOptions")
+
+class HedgePolicy:
+    def __init__(self, delay: Optional[float] = None, percentile: float = 95.0, min_samples: int = 20,
+                 min_delay: float = 0.005, methods: Iterable[str] = HEDGED_METHODS):
+        """
+        Initialize a policy for hedged requests: if a call has not finished after the
+        hedge delay, a second identical call is sent and the first response wins.
+        Only idempotent calls are hedged.
+
+        Args:
+            delay (Optional[float]): Fixed hedge delay in seconds; if omitted the delay is
+                the given percentile of the method's observed latency
+            percentile (float): Latency percentile used as the delay when delay is omitted
+            min_samples (int): Calls to observe before hedging with a percentile delay
+            min_delay (float): Lower limit of the delay in seconds
+            methods (Iterable[str]): Names of the RPCs that are hedged
+        """
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.methods = frozenset(methods)
+
+class BatchPolicy:
+    def __init__(self, max_batch_size: int = 8, max_delay: float = 0.005):
+        """
+        Initialize a policy for combining single predict calls into BatchPredict requests.
+
+        Args:
+            max_batch_size (int): Batch is sent as soon as it has this many images
+            max_delay (float): Maximum time in seconds a call waits for others to join its batch
+        """
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
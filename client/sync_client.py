@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent import futures
+from typing import Coroutine, Dict, List, Optional, Sequence, Tuple, Union
+import grpc
+
+from client.async_client import AsyncDetectorClient
+from client.histogram import LatencyHistogram
+from client.policies import BatchPolicy, HedgePolicy, RetryPolicy
+
+class DetectorClient:
+    def __init__(self, target: str, pool_size: int = 2, timeout: float = 30.0, retry: Optional[RetryPolicy] = None,
+                 hedge: Optional[HedgePolicy] = None, batching: Optional[BatchPolicy] = None,
+                 max_in_flight: int = 128, channel_options: Optional[Sequence[Tuple[str, object]]] = None,
+                 credentials: Optional[grpc.ChannelCredentials] = None):
+        """
+        Initialize a blocking client of the gRPC InstanceDetector service.
+        Calls run on an AsyncDetectorClient in a background event loop, so any number of
+        threads can share one client and *_future() methods pipeline requests without threads.
+        Arguments are the same as for AsyncDetectorClient.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="detector-client", daemon=True)
+        self.thread.start()
+
+        async def create() -> AsyncDetectorClient:
+            # Channels belong to the loop they are created in
+            return AsyncDetectorClient(target, pool_size=pool_size, timeout=timeout, retry=retry, hedge=hedge,
+                                       batching=batching, max_in_flight=max_in_flight,
+                                       channel_options=channel_options, credentials=credentials)
+        self.client = self._submit(create()).result()
+
+    def _submit(self, coroutine: Coroutine) -> futures.Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def predict(self, url: str, timeout: Optional[float] = None) -> List[str]:
+        """See AsyncDetectorClient.predict"""
+        return self.predict_future(url, timeout).result()
+
+    def predict_future(self, url: str, timeout: Optional[float] = None) -> futures.Future:
+        """Start a predict call without waiting; the future's result is the list of labels"""
+        return self._submit(self.client.predict(url, timeout))
+
+    def predict_many(self, urls: List[str], timeout: Optional[float] = None,
+                     return_exceptions: bool = False) -> List[Union[List[str], Exception]]:
+        """See AsyncDetectorClient.predict_many"""
+        return self._submit(self.client.predict_many(urls, timeout, return_exceptions)).result()
+
+    def predict_with_confidence(self, url: str, timeout: Optional[float] = None) -> List[Dict[str, Union[str, float]]]:
+        return self._submit(self.client.predict_with_confidence(url, timeout)).result()
+
+    def predict_with_options(self, url: str, confidence_threshold: float = 0.75, max_objects: Optional[int] = None,
+                             timeout: Optional[float] = None) -> List[str]:
+        return self._submit(self.client.predict_with_options(url, confidence_threshold, max_objects,
+                                                             timeout)).result()
+
+    def batch_predict(self, urls: List[str], timeout: Optional[float] = None) -> List[Dict]:
+        return self._submit(self.client.batch_predict(urls, timeout)).result()
+
+    def model_info(self, timeout: Optional[float] = None) -> Dict:
+        return self._submit(self.client.model_info(timeout)).result()
+
+    def health(self, timeout: Optional[float] = None) -> Dict:
+        return self._submit(self.client.health(timeout)).result()
+
+    @property
+    def latency(self) -> Dict[str, LatencyHistogram]:
+        return self.client.latency
+
+    def stats(self) -> Dict:
+        """See AsyncDetectorClient.stats"""
+        return self.client.stats()
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self._submit(self.client.close()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "DetectorClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
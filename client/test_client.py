@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent import futures
+import grpc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from proto import inference_pb2
+from proto import inference_pb2_grpc
+from client import (AsyncDetectorClient, BatchPolicy, DetectorClient, HedgePolicy, LatencyHistogram,
+                    RetryPolicy)
+
+class FakeServicer(inference_pb2_grpc.InstanceDetectorServicer):
+    """
+    Servicer that reports the URL as the only detected object.
+    URLs control its behavior: 'slow-<seconds>' sleeps, also in batches, 'fail-<n>-<code>' fails the first n
+    calls with the status code and always fails in batches, 'hedge' is slow on the first call only.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.batch_sizes = []
+
+    def _count(self, url: str) -> int:
+        with self.lock:
+            self.calls[url] = self.calls.get(url, 0) + 1
+            return self.calls[url]
+
+    def Predict(self, request, context):
+        calls = self._count(request.url)
+        if request.url.startswith("slow-"):
+            time.sleep(float(request.url.split("-")[1]))
+        if request.url.startswith("fail-"):
+            _, failures, code = request.url.split("-")
+            if calls <= int(failures):
+                context.abort(grpc.StatusCode[code], "Injected failure")
+        if request.url == "hedge" and calls == 1:
+            time.sleep(2)
+        return inference_pb2.PredictResponse(objects=[request.url])
+
+    def BatchPredict(self, request, context):
+        with self.lock:
+            self.batch_sizes.append(len(request.urls))
+        for url in request.urls:
+            if url.startswith("slow-"):
+                time.sleep(float(url.split("-")[1]))
+        return inference_pb2.BatchPredictResponse(results=[
+            inference_pb2.BatchPredictResult(url=url, error="Injected failure", code=url.split("-")[2])
+            if url.startswith("fail-") else inference_pb2.BatchPredictResult(url=url, objects=[url])
+            for url in request.urls
+        ])
+
+def start_server():
+    """Helper function to start the fake servicer on a free local port"""
+    servicer = FakeServicer()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32))
+    inference_pb2_grpc.add_InstanceDetectorServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, servicer, f"127.0.0.1:{port}"
+
+def expect_error(code: grpc.StatusCode, call):
+    """Helper function to check that a call fails with the given status code"""
+    try:
+        call()
+    except grpc.RpcError as e:
+        assert e.code() == code, f"Expected {code}, got {e.code()}"
+        return
+    raise AssertionError(f"Call should fail with {code}")
+
+def test_latency_histogram():
+    """Test that percentiles are estimated within one bucket"""
+    print("\n=== Testing latency histogram ===")
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    histogram.record(5.0, error=True)
+    summary = histogram.summary()
+    print("Summary:", summary)
+    assert summary["count"] == 100 and summary["errors"] == 1
+    assert 50 <= summary["p50_ms"] <= 50 * 1.25
+    assert 99 <= summary["p99_ms"] <= 100
+    assert summary["max_ms"] == 100
+
+def test_retry_policy():
+    """Test that only retryable codes are retried and the backoff grows up to its limit"""
+    print("\n=== Testing retry policy ===")
+    policy = RetryPolicy(max_attempts=3, initial_backoff=0.1, max_backoff=0.3, jitter=0)
+    assert policy.should_retry(grpc.StatusCode.UNAVAILABLE, 1)
+    assert not policy.should_retry(grpc.StatusCode.UNAVAILABLE, 3)
+    assert not policy.should_retry(grpc.StatusCode.INVALID_ARGUMENT, 1)
+    assert [round(policy.backoff(attempt), 3) for attempt in (1, 2, 3)] == [0.1, 0.2, 0.3]
+
+def test_sync_client():
+    """Test blocking calls, pipelining, retries and deadlines"""
+    print("\n=== Testing sync client ===")
+    server, servicer, address = start_server()
+    try:
+        with DetectorClient(address, pool_size=2, retry=RetryPolicy(initial_backoff=0.01)) as client:
+            assert client.predict("a") == ["a"]
+
+            # Pipelined calls are served concurrently instead of one after another
+            urls = [f"slow-0.2-{i}" for i in range(20)]
+            start_time = time.perf_counter()
+            assert client.predict_many(urls) == [[url] for url in urls]
+            assert time.perf_counter() - start_time < 2, "20 calls of 0.2 s should overlap"
+
+            assert client.predict("fail-2-UNAVAILABLE") == ["fail-2-UNAVAILABLE"]
+            assert servicer.calls["fail-2-UNAVAILABLE"] == 3
+            expect_error(grpc.StatusCode.INVALID_ARGUMENT, lambda: client.predict("fail-1-INVALID_ARGUMENT"))
+            assert servicer.calls["fail-1-INVALID_ARGUMENT"] == 1, "Non-retryable errors should not be retried"
+
+            start_time = time.perf_counter()
+            expect_error(grpc.StatusCode.DEADLINE_EXCEEDED, lambda: client.predict("slow-2", timeout=0.2))
+            assert time.perf_counter() - start_time < 1
+
+            stats = client.stats()
+            print("Stats:", stats)
+            assert stats["retries"] == 2
+            assert stats["latency"]["Predict"]["count"] == 22
+            assert stats["latency"]["Predict"]["errors"] == 2
+    finally:
+        server.stop(0)
+
+def test_batching():
+    """Test that concurrent predict calls are combined into batches"""
+    print("\n=== Testing client-side batching ===")
+    server, servicer, address = start_server()
+
+    async def run():
+        async with AsyncDetectorClient(address, batching=BatchPolicy(max_batch_size=4, max_delay=0.05)) as client:
+            urls = [str(i) for i in range(10)] + ["fail-1-RESOURCE_EXHAUSTED", "fail-9-INVALID_ARGUMENT"]
+            results = await client.predict_many(urls, return_exceptions=True)
+            assert results[:10] == [[str(i)] for i in range(10)]
+            # Only images that failed in a batch with a retryable code are retried on their own
+            assert results[10] == ["fail-1-RESOURCE_EXHAUSTED"]
+            assert isinstance(results[11], grpc.RpcError)
+            assert results[11].code() == grpc.StatusCode.INVALID_ARGUMENT
+            return client.stats()
+
+    try:
+        stats = asyncio.run(run())
+        print("Batch sizes:", servicer.batch_sizes)
+        assert servicer.batch_sizes == [4, 4, 4]
+        assert stats["batches"] == 3
+        # Resent images are recorded once, as one call of predict()
+        assert stats["latency"]["Predict"]["count"] == 11 and stats["latency"]["Predict"]["errors"] == 1
+        assert servicer.calls == {"fail-1-RESOURCE_EXHAUSTED": 2}, "Only retryable errors should be retried"
+        assert stats["retries"] == 2
+    finally:
+        server.stop(0)
+
+def test_hedging():
+    """Test that a slow call is hedged and the faster response is used"""
+    print("\n=== Testing hedged requests ===")
+    server, servicer, address = start_server()
+    try:
+        with DetectorClient(address, hedge=HedgePolicy(delay=0.05)) as client:
+            start_time = time.perf_counter()
+            assert client.predict("hedge") == ["hedge"]
+            assert time.perf_counter() - start_time < 1, "Hedged request should not wait for the slow one"
+            assert client.predict("a") == ["a"]
+            assert client.stats()["hedges"] == 1
+            assert servicer.calls["hedge"] == 2
+            # Hedging a batch would repeat the work for all of its images
+            assert client.batch_predict(["slow-0.2"]) == [{"url": "slow-0.2", "objects": ["slow-0.2"]}]
+            assert client.stats()["hedges"] == 1 and servicer.batch_sizes == [1]
+    finally:
+        server.stop(0)
+
+def run_all_tests():
+    """Run all test functions"""
+    test_latency_histogram()
+    test_retry_policy()
+    test_sync_client()
+    test_batching()
+    test_hedging()
+    print("\n=== All tests completed successfully ===")
+
+if __name__ == "__main__":
+    run_all_tests()
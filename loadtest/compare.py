@@ -0,0 +1,39 @@
+import argparse
+import json
+from typing import Dict, Tuple
+
+def load_runs(path: str) -> Dict[Tuple[str, str, float], Dict]:
+    """Helper function to index the runs of a results file by target, mode and load level"""
+    with open(path) as f:
+        results = json.load(f)
+    return {(run["target"], run["mode"], run["level"]): run for run in results["runs"]}
+
+def change(old: float, new: float) -> str:
+    """Helper function to format a relative change"""
+    if old == 0:
+        return "n/a"
+    return f"{(new - old) / old:+.1%}"
+
+def compare(baseline_path: str, candidate_path: str):
+    """Print throughput, latency and error rate changes between two load test results"""
+    baseline = load_runs(baseline_path)
+    candidate = load_runs(candidate_path)
+    print(f"{'target':<20}{'mode':<8}{'level':>7}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>16}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        target, mode, level = key
+        print(f"{target:<20}{mode:<8}{level:>7}"
+              f"{change(old['throughput_rps'], new['throughput_rps']):>10}"
+              f"{change(old['latency_ms']['p50'], new['latency_ms']['p50']):>10}"
+              f"{change(old['latency_ms']['p95'], new['latency_ms']['p95']):>10}"
+              f"{change(old['latency_ms']['p99'], new['latency_ms']['p99']):>10}"
+              f"{old['error_rate']:>8.1%}{new['error_rate']:>8.1%}")
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"Only in {'baseline' if key in baseline else 'candidate'}: {key}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two load test result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+    compare(args.baseline, args.candidate)
@@ -0,0 +1,104 @@
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageDraw
+
+# Sizes of the synthetic corpus, from thumbnails to full HD photos
+DEFAULT_SIZES = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+
+def synthetic_image(width: int, height: int, seed: int) -> bytes:
+    """
+    Draw a reproducible JPEG image with random shapes.
+
+    Args:
+        width (int): Image width
+        height (int): Image height
+        seed (int): Seed of the random generator
+
+    Returns:
+        bytes: Encoded JPEG image
+    """
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(20):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 2), y0 + rng.randrange(height // 2)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+def build_corpus(directory: Optional[str] = None, sizes: List[Tuple[int, int]] = DEFAULT_SIZES,
+                 per_size: int = 2) -> Dict[str, bytes]:
+    """
+    Build the fixed image corpus served to the model servers.
+
+    Args:
+        directory (Optional[str]): Directory with images to serve; a synthetic corpus is generated if omitted
+        sizes (List[Tuple[int, int]]): Sizes of synthetic images
+        per_size (int): Number of synthetic images per size
+
+    Returns:
+        Dict[str, bytes]: Encoded images by file name
+    """
+    if directory:
+        corpus = {}
+        for name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus[name] = f.read()
+        return corpus
+    return {
+        f"{width}x{height}_{i}.jpg": synthetic_image(width, height, seed=width * height + i)
+        for width, height in sizes
+        for i in range(per_size)
+    }
+
+class ImageServer:
+    def __init__(self, corpus: Dict[str, bytes], host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize a local HTTP server that serves the corpus from memory.
+
+        Args:
+            corpus (Dict[str, bytes]): Encoded images by file name
+            host (str): Address to listen on
+            port (int): Port to listen on, 0 picks a free port
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                data = corpus.get(self.path.lstrip('/'))
+                if data is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.corpus = corpus
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def urls(self) -> List[str]:
+        host, port = self.server.server_address[:2]
+        return [f"http://{host}:{port}/{name}" for name in self.corpus]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+import grpc
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from proto import inference_pb2
+from proto import inference_pb2_grpc
+from loadtest.corpus import ImageServer, build_corpus
+from loadtest.runner import ProcessMonitor, run_closed_loop, run_open_loop
+from loadtest.targets import TARGETS, make_target
+
+def free_port() -> int:
+    """Helper function to find a free TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class ServerProcess:
+    def __init__(self, kind: str, checkpoint: str, workdir: str, extra_env: Optional[Dict[str, str]] = None):
+        """
+        Initialize a model server started as a subprocess.
+
+        Args:
+            kind (str): 'http' or 'grpc'
+            checkpoint (str): Value of MODEL_CHECKPOINT ('default', 'random' or a path)
+            workdir (str): Directory for job databases and logs
+            extra_env (Optional[Dict[str, str]]): Additional environment variables
+        """
+        self.kind = kind
+        self.port = free_port()
+        env = dict(os.environ, MODEL_CHECKPOINT=checkpoint,
+                   JOBS_DB_PATH=os.path.join(workdir, f"{kind}_jobs.db"), **(extra_env or {}))
+        if kind == "http":
+            env["HTTP_PORT"] = str(self.port)
+            self.address = f"http://127.0.0.1:{self.port}"
+        else:
+            env["GRPC_PORT"] = str(self.port)
+            env["METRICS_PORT"] = str(free_port())
+            self.address = f"127.0.0.1:{self.port}"
+        self.log = open(os.path.join(workdir, f"{kind}_server.log"), "w")
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server", f"{kind}_server.py")],
+            env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    def wait_ready(self, timeout: float):
+        """Wait until the server answers its health check"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.kind} server exited, see {self.log.name}")
+            try:
+                if self.kind == "http":
+                    requests.get(f"{self.address}/health", timeout=1).raise_for_status()
+                else:
+                    stub = inference_pb2_grpc.InstanceDetectorStub(grpc.insecure_channel(self.address))
+                    stub.HealthCheck(inference_pb2.Empty(), timeout=1)
+                return
+            except Exception:
+                time.sleep(0.5)
+        raise TimeoutError(f"{self.kind} server did not start in {timeout} seconds")
+
+    def stop(self):
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+def git_commit() -> str:
+    """Helper function to get the commit the benchmark was run on"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def run_scenarios(args, urls: List[str], servers: Dict[str, Optional[ServerProcess]]) -> List[Dict]:
+    """Run every target at every load level and collect the results"""
+    runs = []
+    levels = args.concurrency if args.mode == "closed" else args.rate
+    for name in args.targets:
+        kind = name.split("_", 1)[0]
+        server = servers.get(kind)
+        target = make_target(name, urls, args.http_address, args.grpc_address, batch_size=args.batch_size,
+                             timeout=args.timeout)
+
+        # Warm up the endpoint so model initialization does not skew the first level
+        for _ in range(args.warmup):
+            try:
+                target()
+            except Exception as e:
+                print(f"Warmup request to {name} failed: {e}")
+
+        for level in levels:
+            print(f"Running {name}: {args.mode} loop, {'concurrency' if args.mode == 'closed' else 'rate'} {level}")
+            monitor = ProcessMonitor(server.process.pid) if server else None
+            if monitor:
+                monitor.start()
+            if args.mode == "closed":
+                summary = run_closed_loop(target, int(level), args.duration)
+            else:
+                summary = run_open_loop(target, level, args.duration, max_concurrency=args.max_concurrency,
+                                        arrival=args.arrival, seed=args.seed)
+            run = {"target": name, "mode": args.mode, "level": level, **summary}
+            if name.endswith("batch_predict"):
+                run["images_per_second"] = summary["throughput_rps"] * args.batch_size
+            if monitor:
+                run["server"] = monitor.stop()
+            runs.append(run)
+            print_run(run)
+    return runs
+
+def print_run(run: Dict):
+    latency = run["latency_ms"]
+    line = (f"  {run['requests']} requests, {run['throughput_rps']:.2f} req/s, errors {run['error_rate']:.1%}, "
+            f"p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, p99 {latency['p99']:.0f} ms")
+    if "server" in run:
+        line += f", server RSS {run['server']['rss_peak_mb']:.0f} MB, CPU {run['server']['cpu_percent']:.0f}%"
+    print(line)
+    for error in run["error_samples"]:
+        print(f"  error: {error}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test of the HTTP and gRPC servers")
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        type=lambda value: value.split(","), help=f"Comma-separated subset of {TARGETS}")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed: fixed number of clients; open: fixed request rate")
+    parser.add_argument("--concurrency", default="1,4", type=lambda value: [int(v) for v in value.split(",")],
+                        help="Comma-separated client counts for closed-loop runs")
+    parser.add_argument("--rate", default="1,2", type=lambda value: [float(v) for v in value.split(",")],
+                        help="Comma-separated requests per second for open-loop runs")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Requests in flight limit in open loop")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per load level")
+    parser.add_argument("--warmup", type=int, default=2, help="Requests sent before measuring each target")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Directory with images to serve (synthetic images if omitted)")
+    parser.add_argument("--checkpoint", default="random",
+                        help="MODEL_CHECKPOINT of started servers: 'random', 'default' or a state dict path")
+    parser.add_argument("--no-start", action="store_true",
+                        help="Use already running servers at --http-address/--grpc-address")
+    parser.add_argument("--http-address", default="http://127.0.0.1:8080")
+    parser.add_argument("--grpc-address", default="127.0.0.1:9090")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        sys.exit(f"Unknown targets: {sorted(unknown)}")
+
+    image_server = ImageServer(build_corpus(args.corpus))
+    image_server.start()
+    print(f"Serving {len(image_server.corpus)} images")
+
+    servers = {}
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    try:
+        if not args.no_start:
+            for kind in sorted({name.split("_", 1)[0] for name in args.targets}):
+                servers[kind] = ServerProcess(kind, args.checkpoint, workdir)
+            for server in servers.values():
+                server.wait_ready(args.startup_timeout)
+            if "http" in servers:
+                args.http_address = servers["http"].address
+            if "grpc" in servers:
+                args.grpc_address = servers["grpc"].address
+        runs = run_scenarios(args, image_server.urls, servers)
+    finally:
+        for server in servers.values():
+            server.stop()
+        image_server.stop()
+
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args)
+        },
+        "runs": runs
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
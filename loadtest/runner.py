@@ -0,0 +1,196 @@
+import math
+import os
+import random
+import threading
+import time
+from concurrent import futures
+from typing import Callable, Dict, List, Optional
+
+# Keep a few error messages per run for the report
+MAX_ERROR_SAMPLES = 5
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+class Recorder:
+    """Thread-safe collection of request outcomes"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.error_samples = []
+
+    def record(self, latency: float, error: Optional[Exception] = None):
+        with self.lock:
+            if error is None:
+                self.latencies.append(latency)
+            else:
+                self.errors += 1
+                if len(self.error_samples) < MAX_ERROR_SAMPLES:
+                    self.error_samples.append(str(error)[:200])
+
+    def summary(self, elapsed: float) -> Dict:
+        """
+        Summarize the recorded outcomes.
+
+        Args:
+            elapsed (float): Wall time of the run in seconds
+
+        Returns:
+            Dict: Request counts, throughput and latency percentiles in ms
+        """
+        latencies = sorted(self.latencies)
+        total = len(latencies) + self.errors
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": self.errors / total if total else 0.0,
+            "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+                "max": latencies[-1] * 1000 if latencies else 0.0
+            },
+            "error_samples": self.error_samples
+        }
+
+def timed_call(target: Callable[[], None], recorder: Recorder, start_time: float):
+    """Call the target and record its latency measured from start_time"""
+    try:
+        target()
+    except Exception as e:
+        recorder.record(time.perf_counter() - start_time, e)
+    else:
+        recorder.record(time.perf_counter() - start_time)
+
+def run_closed_loop(target: Callable[[], None], concurrency: int, duration: float) -> Dict:
+    """
+    Run a fixed number of clients that send the next request as soon as the previous one completes.
+
+    Args:
+        target (Callable[[], None]): Function that sends one request and raises on failure
+        concurrency (int): Number of concurrent clients
+        duration (float): Duration of the run in seconds
+
+    Returns:
+        Dict: Summary of the run
+    """
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            timed_call(target, recorder, time.perf_counter())
+
+    start_time = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.perf_counter() - start_time)
+
+def run_open_loop(target: Callable[[], None], rate: float, duration: float, max_concurrency: int = 64,
+                  arrival: str = "poisson", seed: int = 0) -> Dict:
+    """
+    Send requests at a fixed average rate regardless of how fast the server answers.
+    Latency is measured from the scheduled send time, so time spent waiting for a
+    free client slot counts against the server.
+
+    Args:
+        target (Callable[[], None]): Function that sends one request and raises on failure
+        rate (float): Requests per second
+        duration (float): Duration of the run in seconds
+        max_concurrency (int): Maximum number of requests in flight
+        arrival (str): 'poisson' for exponential inter-arrival times or 'constant'
+        seed (int): Seed of the inter-arrival time generator
+
+    Returns:
+        Dict: Summary of the run
+    """
+    recorder = Recorder()
+    rng = random.Random(seed)
+    executor = futures.ThreadPoolExecutor(max_workers=max_concurrency)
+
+    start_time = time.perf_counter()
+    # Offsets from the start rather than a running sum of absolute times, so that float
+    # rounding cannot add a request at the end of the run
+    offset, sent = 0.0, 0
+    pending = []
+    while offset < duration:
+        scheduled = start_time + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.append(executor.submit(timed_call, target, recorder, scheduled))
+        sent += 1
+        offset = offset + rng.expovariate(rate) if arrival == "poisson" else sent / rate
+
+    futures.wait(pending)
+    executor.shutdown()
+    summary = recorder.summary(time.perf_counter() - start_time)
+    summary["offered_rps"] = rate
+    return summary
+
+class ProcessMonitor:
+    def __init__(self, pid: int, interval: float = 0.5):
+        """
+        Initialize a sampler of memory and CPU usage of a server process (Linux only).
+
+        Args:
+            pid (int): ID of the process to sample
+            interval (float): Time between samples in seconds
+        """
+        self.pid = pid
+        self.interval = interval
+        self.rss_samples = []
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK")
+
+    def _rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the command name; utime and stime are fields 14 and 15
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks_per_second
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.rss_samples.append(self._rss_mb())
+            except OSError:
+                return
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.start_cpu = self._cpu_seconds()
+        self.thread.start()
+
+    def stop(self) -> Dict:
+        """
+        Stop sampling and summarize resource usage.
+
+        Returns:
+            Dict: Peak and mean RSS in MB and average CPU utilization in percent of one core
+        """
+        self.stop_event.set()
+        self.thread.join()
+        elapsed = time.perf_counter() - self.start_time
+        samples = self.rss_samples or [self._rss_mb()]
+        return {
+            "rss_peak_mb": max(samples),
+            "rss_mean_mb": sum(samples) / len(samples),
+            "cpu_percent": (self._cpu_seconds() - self.start_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+        }
@@ -0,0 +1,81 @@
+import itertools
+import os
+import sys
+import threading
+from typing import Callable, List
+import grpc
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from proto import inference_pb2
+from proto import inference_pb2_grpc
+
+TARGETS = ["http_predict", "http_batch_predict", "grpc_predict", "grpc_batch_predict"]
+
+class UrlCycle:
+    """Thread-safe round robin over the corpus URLs"""
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def take(self, count: int = 1) -> List[str]:
+        with self.lock:
+            return [self.urls[next(self.counter) % len(self.urls)] for _ in range(count)]
+
+def check_batch_errors(errors: List[str]) -> None:
+    """Helper function to fail a batch request if any image failed"""
+    failed = [error for error in errors if error]
+    if failed:
+        raise RuntimeError(f"{len(failed)}/{len(errors)} images failed: {failed[0]}")
+
+def make_target(name: str, urls: List[str], http_address: str, grpc_address: str,
+                batch_size: int = 8, timeout: float = 120.0) -> Callable[[], None]:
+    """
+    Build a function that sends one request to the given endpoint.
+
+    Args:
+        name (str): One of TARGETS
+        urls (List[str]): Image URLs to send, used round robin
+        http_address (str): Base URL of the HTTP server
+        grpc_address (str): Address of the gRPC server
+        batch_size (int): Number of images per batch request
+        timeout (float): Request timeout in seconds
+
+    Returns:
+        Callable[[], None]: Function that raises on any failed request
+    """
+    cycle = UrlCycle(urls)
+
+    if name.startswith("http"):
+        # One keep-alive session per client thread
+        local = threading.local()
+
+        def session() -> requests.Session:
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            return local.session
+
+        def http_predict():
+            response = session().post(f"{http_address}/predict", json={"url": cycle.take()[0]}, timeout=timeout)
+            response.raise_for_status()
+
+        def http_batch_predict():
+            response = session().post(f"{http_address}/batch_predict", json={"urls": cycle.take(batch_size)},
+                                      timeout=timeout)
+            response.raise_for_status()
+            check_batch_errors([result.get("error") for result in response.json()["results"]])
+
+        return {"http_predict": http_predict, "http_batch_predict": http_batch_predict}[name]
+
+    # gRPC channels multiplex concurrent calls, so one channel is shared by all clients
+    stub = inference_pb2_grpc.InstanceDetectorStub(grpc.insecure_channel(grpc_address))
+
+    def grpc_predict():
+        stub.Predict(inference_pb2.PredictRequest(url=cycle.take()[0]), timeout=timeout)
+
+    def grpc_batch_predict():
+        response = stub.BatchPredict(inference_pb2.BatchPredictRequest(urls=cycle.take(batch_size)), timeout=timeout)
+        check_batch_errors([result.error for result in response.results])
+
+    return {"grpc_predict": grpc_predict, "grpc_batch_predict": grpc_batch_predict}[name]
@@ -0,0 +1,66 @@
+import time
+from runner import percentile, run_closed_loop, run_open_loop
+from corpus import ImageServer, build_corpus
+import requests
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    print("\n=== Testing percentiles ===")
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+def test_closed_loop():
+    """Test that a closed loop keeps the given number of requests in flight and counts errors"""
+    print("\n=== Testing closed loop ===")
+    calls = []
+
+    def target():
+        calls.append(1)
+        time.sleep(0.01)
+        if len(calls) % 4 == 0:
+            raise RuntimeError("failed")
+
+    summary = run_closed_loop(target, concurrency=2, duration=0.5)
+    print("Summary:", summary)
+    assert summary["requests"] == len(calls)
+    assert 0 < summary["errors"] < summary["requests"]
+    assert summary["throughput_rps"] > 50, "Two clients with 10 ms requests should exceed 50 req/s"
+    assert summary["latency_ms"]["p50"] >= 10
+
+def test_open_loop():
+    """Test that an open loop sends requests at the offered rate and includes queueing in latency"""
+    print("\n=== Testing open loop ===")
+    summary = run_open_loop(lambda: time.sleep(0.05), rate=40, duration=0.5, max_concurrency=1,
+                            arrival="constant")
+    print("Summary:", summary)
+    assert summary["requests"] == 20
+    # A single slot serves 20 req/s, so later requests wait behind earlier ones
+    assert summary["latency_ms"]["max"] > 200
+
+def test_image_server():
+    """Test that the synthetic corpus is reproducible and served over HTTP"""
+    print("\n=== Testing image server ===")
+    corpus = build_corpus(sizes=[(64, 48)], per_size=2)
+    assert corpus == build_corpus(sizes=[(64, 48)], per_size=2), "Corpus should be reproducible"
+    server = ImageServer(corpus)
+    server.start()
+    try:
+        for url in server.urls:
+            response = requests.get(url)
+            assert response.content == corpus[url.rsplit('/', 1)[-1]]
+    finally:
+        server.stop()
+
+def run_all_tests():
+    """Run all test functions"""
+    test_percentile()
+    test_closed_loop()
+    test_open_loop()
+    test_image_server()
+    print("\n=== All tests completed successfully ===")
+
+if __name__ == "__main__":
+    run_all_tests()
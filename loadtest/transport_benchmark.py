@@ -0,0 +1,233 @@
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Tuple
+import grpc
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from proto import inference_pb2
+from proto import inference_pb2_grpc
+from server.shared_memory import ENCODED, RAW_RGB
+from loadtest.corpus import ImageServer, synthetic_image
+from loadtest.load_test import ServerProcess, git_commit
+from loadtest.runner import ProcessMonitor, run_closed_loop
+
+# Ways of getting an image to the model: over TCP or a Unix domain socket, either as a URL
+# the server downloads or as a handle to a shared memory segment written by the client
+TRANSPORTS = ["grpc_tcp_url", "grpc_uds_url", "grpc_uds_shm_encoded", "grpc_uds_shm_raw",
+              "http_tcp_url", "http_uds_url", "http_uds_shm_encoded", "http_uds_shm_raw"]
+DEFAULT_SIZES = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket"""
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+class SegmentPool:
+    """Reusable shared memory segment per client thread, like a sidecar's frame buffer"""
+    def __init__(self, size: int):
+        self.size = size
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.segments = []
+
+    def get(self) -> SharedMemory:
+        if not hasattr(self.local, "segment"):
+            self.local.segment = SharedMemory(create=True, size=self.size)
+            with self.lock:
+                self.segments.append(self.local.segment)
+        return self.local.segment
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+def make_transport(name: str, url: str, encoded: bytes, servers: Dict[str, ServerProcess],
+                   uds_paths: Dict[str, str], segments: SegmentPool, timeout: float) -> Callable[[], None]:
+    """
+    Build a function that sends one prediction request for the image over the given transport.
+    Shared memory transports copy the image into the client's segment on every request.
+
+    Args:
+        name (str): One of TRANSPORTS
+        url (str): URL of the image on the local image server
+        encoded (bytes): Encoded image, the content of url
+        servers (Dict[str, ServerProcess]): Running servers by kind
+        uds_paths (Dict[str, str]): Unix socket paths of the servers by kind
+        segments (SegmentPool): Shared memory segments of the client threads
+        timeout (float): Request timeout in seconds
+
+    Returns:
+        Callable[[], None]: Function that raises on any failed request
+    """
+    kind, link, source = name.split("_", 2)
+    if source.startswith("shm"):
+        image_format = RAW_RGB if source == "shm_raw" else ENCODED
+        image = Image.open(BytesIO(encoded)).convert('RGB')
+        data = image.tobytes() if image_format == RAW_RGB else encoded
+        width, height = image.size
+
+        def handle() -> Dict:
+            segment = segments.get()
+            segment.buf[:len(data)] = data
+            return {"name": segment.name, "offset": 0, "size": len(data), "format": image_format,
+                    "width": width, "height": height}
+
+    if kind == "grpc":
+        address = f"unix:{uds_paths['grpc']}" if link == "uds" else servers["grpc"].address
+        stub = inference_pb2_grpc.InstanceDetectorStub(grpc.insecure_channel(address))
+        if source == "url":
+            return lambda: stub.Predict(inference_pb2.PredictRequest(url=url), timeout=timeout)
+        return lambda: stub.PredictSharedMemory(inference_pb2.SharedMemoryPredictRequest(
+            image=inference_pb2.SharedMemoryImage(**handle())), timeout=timeout)
+
+    # One keep-alive connection per client thread; http.client keeps client overhead comparable to gRPC
+    local = threading.local()
+    port = int(servers["http"].address.rsplit(":", 1)[1])
+
+    def connection() -> http.client.HTTPConnection:
+        if not hasattr(local, "connection"):
+            local.connection = (UnixHTTPConnection(uds_paths["http"], timeout) if link == "uds"
+                                else http.client.HTTPConnection("127.0.0.1", port, timeout=timeout))
+        return local.connection
+
+    def http_request():
+        if source == "url":
+            path, body = "/predict", {"url": url}
+        else:
+            path, body = "/predict_shared_memory", {"image": handle()}
+        conn = connection()
+        conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        content = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {content[:200]!r}")
+
+    return http_request
+
+def run_benchmark(args, servers: Dict[str, ServerProcess], uds_paths: Dict[str, str]) -> List[Dict]:
+    """Run every transport at every image size and collect latency and CPU per request"""
+    runs = []
+    for width, height in args.sizes:
+        encoded = synthetic_image(width, height, seed=width * height)
+        image_server = ImageServer({"image.jpg": encoded})
+        image_server.start()
+        segments = SegmentPool(max(width * height * 3, len(encoded)))
+        try:
+            for name in args.transports:
+                target = make_transport(name, image_server.urls[0], encoded, servers, uds_paths,
+                                        segments, args.timeout)
+                for _ in range(args.warmup):
+                    target()
+
+                monitor = ProcessMonitor(servers[name.split("_", 1)[0]].process.pid)
+                monitor.start()
+                client_cpu = time.process_time()
+                summary = run_closed_loop(target, args.concurrency, args.duration)
+                # The client process also serves the image for URL transports
+                client_cpu = time.process_time() - client_cpu
+                server = monitor.stop()
+
+                completed = summary["requests"] - summary["errors"]
+                rps = summary["throughput_rps"]
+                run = {
+                    "transport": name, "size": f"{width}x{height}", **summary,
+                    "server": server,
+                    # CPU seconds per second divided by requests per second
+                    "server_cpu_ms_per_request": server["cpu_percent"] / 100 / rps * 1000 if rps else 0.0,
+                    "client_cpu_ms_per_request": client_cpu / completed * 1000 if completed else 0.0
+                }
+                runs.append(run)
+                print_run(run)
+        finally:
+            segments.close()
+            image_server.stop()
+    return runs
+
+def print_run(run: Dict):
+    latency = run["latency_ms"]
+    print(f"{run['transport']:<24}{run['size']:>11}{run['throughput_rps']:>9.2f}{latency['mean']:>10.1f}"
+          f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}{run['server_cpu_ms_per_request']:>12.1f}"
+          f"{run['client_cpu_ms_per_request']:>12.1f}{run['errors']:>8}")
+    for error in run["error_samples"]:
+        print(f"  error: {error}")
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latency and CPU of TCP, Unix socket and shared memory transports")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS),
+                        type=lambda value: value.split(","), help=f"Comma-separated subset of {TRANSPORTS}")
+    parser.add_argument("--sizes", default=",".join(f"{w}x{h}" for w, h in DEFAULT_SIZES),
+                        type=lambda value: [parse_size(v) for v in value.split(",")])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per transport and size")
+    parser.add_argument("--warmup", type=int, default=2, help="Requests sent before measuring each case")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--checkpoint", default="random",
+                        help="MODEL_CHECKPOINT of started servers: 'random', 'default' or a state dict path")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    unknown = set(args.transports) - set(TRANSPORTS)
+    if unknown:
+        sys.exit(f"Unknown transports: {sorted(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="transport_")
+    uds_paths = {kind: os.path.join(workdir, f"{kind}.sock") for kind in ("grpc", "http")}
+    servers = {}
+    try:
+        for kind in sorted({name.split("_", 1)[0] for name in args.transports}):
+            servers[kind] = ServerProcess(kind, args.checkpoint, workdir,
+                                          extra_env={f"{kind.upper()}_UDS_PATH": uds_paths[kind]})
+        for server in servers.values():
+            server.wait_ready(args.startup_timeout)
+        print(f"{'transport':<24}{'size':>11}{'req/s':>9}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'server cpu':>12}{'client cpu':>12}{'errors':>8}")
+        runs = run_benchmark(args, servers, uds_paths)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args)
+        },
+        "runs": runs
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+from PIL import Image
+
+# (precision, channels_last) settings compared by default
+SETTINGS = [("fp32", False), ("fp32", True), ("bf16", False), ("bf16", True)]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def load_images(directory: str, count: int) -> List[Image.Image]:
+    """Helper function to load local images, or generate synthetic ones when no directory is given"""
+    if directory:
+        from validate_precision import IMAGE_EXTENSIONS
+
+        names = [name for name in sorted(os.listdir(directory)) if name.lower().endswith(IMAGE_EXTENSIONS)][:count]
+        if not names:
+            raise ValueError(f"No images with extensions {IMAGE_EXTENSIONS} in {directory}")
+        return [Image.open(os.path.join(directory, name)).convert('RGB') for name in names]
+    return [Image.effect_noise((640, 480), 64).convert('RGB') for _ in range(count)]
+
+def run_setting(precision: str, channels_last: bool, images: List[Image.Image], iterations: int, warmup: int) -> Dict:
+    """
+    Measure latency and peak memory of one setting in the current process.
+
+    Returns:
+        Dict: Effective setting, latency statistics in ms and peak RSS in MB
+    """
+    from model import ObjectDetector
+
+    detector = ObjectDetector(precision=precision, channels_last=channels_last)
+    load_rss = peak_rss_mb()
+
+    for i in range(warmup):
+        detector.infer([images[i % len(images)]])
+
+    latencies = []
+    for i in range(iterations):
+        start_time = time.perf_counter()
+        detector.infer([images[i % len(images)]])
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+
+    return {
+        "precision": detector.precision,
+        "channels_last": channels_last,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "load_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def run_all_settings(args) -> List[Dict]:
+    """Run every setting in a fresh process so peak RSS is not shared between settings"""
+    results = []
+    for precision, channels_last in SETTINGS:
+        command = [sys.executable, os.path.abspath(__file__), "--worker",
+                   "--precision", precision, "--iterations", str(args.iterations),
+                   "--warmup", str(args.warmup), "--num-images", str(args.num_images)]
+        if channels_last:
+            command.append("--channels-last")
+        if args.images:
+            command += ["--images", args.images]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark latency and peak memory for each precision setting")
+    parser.add_argument("--images", help="Directory with test images (synthetic 640x480 images if omitted)")
+    parser.add_argument("--num-images", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--precision", default="fp32", choices=["fp32", "bf16"])
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--worker", action="store_true", help="Run a single setting and print JSON")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.worker:
+        images = load_images(args.images, args.num_images)
+        print(json.dumps(run_setting(args.precision, args.channels_last, images, args.iterations, args.warmup)))
+        sys.exit(0)
+
+    results = run_all_settings(args)
+    print(f"{'precision':<10}{'channels_last':<15}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'load MB':>10}{'peak MB':>10}")
+    for r in results:
+        print(f"{r['precision']:<10}{str(r['channels_last']):<15}{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['load_rss_mb']:>10.0f}{r['peak_rss_mb']:>10.0f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
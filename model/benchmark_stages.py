@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+import torch
+from torch.profiler import profile, ProfilerActivity
+from PIL import Image, ImageFilter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model import ObjectDetector
+from proto import inference_pb2
+
+STAGES = ["decode", "transforms", "resize", "backbone", "rpn", "roi_heads", "postprocess", "serialize"]
+DEFAULT_SIZES = [(320, 240), (640, 480), (1280, 720)]
+DEFAULT_BATCH_SIZES = [1, 2]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stage_baseline.json")
+
+def synthetic_jpeg(width: int, height: int, seed: int) -> bytes:
+    """Helper function to encode a reproducible, photo-like test image"""
+    rng = random.Random(seed)
+    image = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    buffer = BytesIO()
+    image.filter(ImageFilter.GaussianBlur(2)).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+def cpu_model() -> str:
+    """Helper function to get the CPU model name; platform.processor() is empty on most Linux systems"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+def machine_fingerprint() -> str:
+    """Identify the hardware timings were measured on; they are only comparable on the same machine"""
+    return f"{platform.machine()}/{cpu_model()}/{os.cpu_count()} cpus/{torch.get_num_threads()} threads"
+
+def build_pipeline(detector: ObjectDetector, encoded: List[bytes]) -> List[Tuple[str, Callable[[], object]]]:
+    """
+    Split ObjectDetector inference into stages that can be timed separately.
+    Runs the pipeline once so every stage gets the real output of the previous one.
+
+    Args:
+        detector (ObjectDetector): Detector to benchmark
+        encoded (List[bytes]): Encoded images forming one batch
+
+    Returns:
+        List[Tuple[str, Callable[[], object]]]: Stage names with functions that run only that stage
+    """
+    model = detector.model
+    transform = detector.weights.transforms()
+
+    def decode():
+        return [Image.open(BytesIO(data)).convert('RGB') for data in encoded]
+    images = decode()
+
+    def transforms():
+        return [transform(image).to(detector.device) for image in images]
+    tensors = transforms()
+    original_sizes = [tuple(tensor.shape[-2:]) for tensor in tensors]
+
+    def resize():
+        return model.transform(tensors)[0]
+    image_list = resize()
+
+    def backbone():
+        return model.backbone(image_list.tensors)
+    features = backbone()
+
+    def rpn():
+        return model.rpn(image_list, features)[0]
+    proposals = rpn()
+
+    def roi_heads():
+        return model.roi_heads(features, proposals, image_list.image_sizes)[0]
+    detections = roi_heads()
+
+    def postprocess():
+        outputs = model.transform.postprocess(detections, image_list.image_sizes, original_sizes)
+        return [detector._extract_labels(output, 0.75, None) for output in outputs]
+    labels = postprocess()
+
+    def serialize():
+        grpc_response = inference_pb2.BatchPredictResponse(results=[
+            inference_pb2.BatchPredictResult(url=str(i), objects=objects) for i, objects in enumerate(labels)
+        ]).SerializeToString()
+        http_response = json.dumps({"results": [{"url": str(i), "objects": objects}
+                                                for i, objects in enumerate(labels)]})
+        return grpc_response, http_response
+
+    return list(zip(STAGES, [decode, transforms, resize, backbone, rpn, roi_heads, postprocess, serialize]))
+
+def measure_memory(fn: Callable[[], object]) -> Dict[str, int]:
+    """
+    Measure allocations of one call.
+
+    Returns:
+        Dict[str, int]: Peak bytes and number of allocations made through the torch
+            CPU allocator, and peak bytes allocated by Python objects
+    """
+    tracemalloc.start()
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "trace.json")
+        prof.export_chrome_trace(trace_path)
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+
+    memory_events = sorted((event for event in events if event.get("name") == "[memory]"),
+                           key=lambda event: event["ts"])
+    allocations, peak = 0, 0
+    if memory_events:
+        start = memory_events[0]["args"]["Total Allocated"] - memory_events[0]["args"]["Bytes"]
+        for event in memory_events:
+            if event["args"]["Bytes"] > 0:
+                allocations += 1
+            peak = max(peak, event["args"]["Total Allocated"] - start)
+    return {"peak_bytes": peak, "allocations": allocations, "python_peak_bytes": python_peak}
+
+def benchmark(detector: ObjectDetector, sizes: List[Tuple[int, int]], batch_sizes: List[int],
+              repeats: int = 5, warmup: int = 1) -> Dict[str, Dict]:
+    """
+    Time every stage at every image size and batch size.
+
+    Args:
+        detector (ObjectDetector): Detector to benchmark
+        sizes (List[Tuple[int, int]]): Image sizes as (width, height)
+        batch_sizes (List[int]): Number of images per batch
+        repeats (int): Timed runs per stage
+        warmup (int): Untimed runs per stage
+
+    Returns:
+        Dict[str, Dict]: Median and min time in ms plus memory statistics, keyed by 'stage/WxH/bN'
+    """
+    results = {}
+    autocast = torch.autocast(detector.device.type, dtype=torch.bfloat16, enabled=detector.precision == 'bf16')
+    with torch.no_grad(), autocast:
+        for width, height in sizes:
+            for batch_size in batch_sizes:
+                encoded = [synthetic_jpeg(width, height, seed=i) for i in range(batch_size)]
+                for stage, fn in build_pipeline(detector, encoded):
+                    for _ in range(warmup):
+                        fn()
+                    times = []
+                    for _ in range(repeats):
+                        start_time = time.perf_counter()
+                        fn()
+                        times.append((time.perf_counter() - start_time) * 1000)
+                    key = f"{stage}/{width}x{height}/b{batch_size}"
+                    results[key] = {"median_ms": statistics.median(times), "min_ms": min(times),
+                                    **measure_memory(fn)}
+                    print(f"{key:<32}{results[key]['median_ms']:>10.2f} ms"
+                          f"{results[key]['peak_bytes'] / 2**20:>10.1f} MB"
+                          f"{results[key]['allocations']:>8} allocs")
+    return results
+
+def baseline_comparisons(baseline: Dict, force_time: bool = False) -> Tuple[bool, bool]:
+    """
+    Decide which results of a baseline are comparable with measurements taken here.
+
+    Returns:
+        Tuple[bool, bool]: Whether timings and whether memory statistics can be compared
+    """
+    meta = baseline.get("meta", {})
+    # Baselines recorded with --memory-only have no machine and no timings
+    compare_time = meta.get("machine") is not None and (force_time or meta["machine"] == machine_fingerprint())
+    return compare_time, meta.get("torch") == torch.__version__
+
+def check_regressions(results: Dict[str, Dict], baseline: Dict, time_tolerance: float, memory_tolerance: float,
+                      stage_tolerances: Optional[Dict[str, float]] = None, force_time: bool = False,
+                      min_time_delta_ms: float = 1.0) -> List[str]:
+    """
+    Compare results with a stored baseline.
+    Timings are only compared on the machine the baseline was recorded on, and
+    memory only with the torch version it was recorded with.
+
+    Args:
+        results (Dict[str, Dict]): Output of benchmark()
+        baseline (Dict): Stored baseline with 'meta' and 'results'
+        time_tolerance (float): Allowed relative slowdown of the median time, e.g. 0.2 for 20%
+        memory_tolerance (float): Allowed relative growth of peak bytes and allocation counts
+        stage_tolerances (Optional[Dict[str, float]]): Time tolerance overrides by stage name
+        force_time (bool): Compare timings even if the baseline comes from another machine
+        min_time_delta_ms (float): Slowdowns smaller than this are timer noise and never reported
+
+    Returns:
+        List[str]: Description of every regression, empty if there are none
+    """
+    stage_tolerances = stage_tolerances or {}
+    meta = baseline.get("meta", {})
+    compare_time, compare_memory = baseline_comparisons(baseline, force_time)
+    if not compare_time:
+        print(f"Baseline timings come from '{meta.get('machine')}', skipping time comparison")
+    if not compare_memory:
+        print(f"Baseline memory comes from torch {meta.get('torch')}, skipping memory comparison")
+
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get("results", {}).get(key)
+        if expected is None:
+            continue
+        if compare_time:
+            tolerance = stage_tolerances.get(key.split("/")[0], time_tolerance)
+            limit_ms = max(expected["median_ms"] * (1 + tolerance), expected["median_ms"] + min_time_delta_ms)
+            if result["median_ms"] > limit_ms:
+                regressions.append(f"{key}: median {result['median_ms']:.2f} ms, "
+                                   f"baseline {expected['median_ms']:.2f} ms")
+        if compare_memory:
+            for metric in ("peak_bytes", "allocations"):
+                if result[metric] > expected[metric] * (1 + memory_tolerance):
+                    regressions.append(f"{key}: {metric} {result[metric]}, baseline {expected[metric]}")
+    return regressions
+
+def save_baseline(path: str, results: Dict[str, Dict], precision: str, memory_only: bool = False):
+    """Store results together with what they were measured on, without timings if memory_only is set"""
+    if memory_only:
+        results = {key: {metric: value for metric, value in result.items() if not metric.endswith("_ms")}
+                   for key, result in results.items()}
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {"machine": None if memory_only else machine_fingerprint(), "torch": torch.__version__,
+                     "precision": precision},
+            "results": results
+        }, f, indent=2, sort_keys=True)
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Per-stage benchmarks and performance regression check")
+    parser.add_argument("--sizes", default=",".join(f"{w}x{h}" for w, h in DEFAULT_SIZES),
+                        type=lambda value: [parse_size(v) for v in value.split(",")])
+    parser.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+                        type=lambda value: [int(v) for v in value.split(",")])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--precision", default="fp32", choices=["fp32", "bf16"])
+    parser.add_argument("--checkpoint", default="random",
+                        help="'random' (seeded, offline), 'default' or a path to a state dict")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--memory-only", action="store_true",
+                        help="Store no timings in the baseline, for baselines not recorded on the benchmark machine")
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--min-time-delta-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this, which matters for sub-millisecond stages")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--stage-tolerance", action="append", default=[],
+                        help="Time tolerance for one stage, e.g. decode=0.5; may be repeated")
+    parser.add_argument("--force-time", action="store_true",
+                        help="Compare timings even if the baseline was recorded on another machine")
+    parser.add_argument("--threads", type=int, help="torch.set_num_threads for stable timings")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    # Random weights are seeded so proposals, and therefore allocations, are reproducible
+    torch.manual_seed(0)
+    detector = ObjectDetector(precision=args.precision, checkpoint=args.checkpoint)
+    results = benchmark(detector, args.sizes, args.batch_sizes, repeats=args.repeats, warmup=args.warmup)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        save_baseline(args.baseline, results, detector.precision, args.memory_only)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create it")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    stage_tolerances = {stage: float(value) for stage, value in
+                        (item.split("=") for item in args.stage_tolerance)}
+    regressions = check_regressions(results, baseline, args.time_tolerance, args.memory_tolerance,
+                                    stage_tolerances, args.force_time, args.min_time_delta_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
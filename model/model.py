@@ -4,50 +4,147 @@ from PIL import Image
 import requests
 from io import BytesIO
 from typing import List, Dict, Union, Optional
+import warnings
+
+PRECISIONS = ('fp32', 'bf16')
+
+# Images are PIL images or uint8 CHW tensors, e.g. views over shared memory
+ImageInput = Union[Image.Image, torch.Tensor]
+
+def bf16_supported(device: torch.device) -> bool:
+    """
+    Check whether bfloat16 autocast is worth enabling on the given device.
+    On CPU this requires native bf16 matrix instructions (AVX512-BF16 or AMX);
+    without them bf16 is emulated and slower than fp32.
+    """
+    if device.type == 'cuda':
+        return torch.cuda.is_bf16_supported()
+    checks = [getattr(torch.cpu, name, None) for name in ('_is_avx512_bf16_supported', '_is_amx_tile_supported')]
+    return torch.backends.mkldnn.is_available() and any(check() for check in checks if check is not None)
 
 class ObjectDetector:
-    def __init__(self):
+    def __init__(self, precision: str = 'fp32', channels_last: bool = False, checkpoint: str = 'default'):
         """
         Initialize the object detector.
         Loads a pre-trained Faster R-CNN model with ResNet50 backbone and FPN.
+        
+        Args:
+            precision (str): Precision of the forward pass, 'fp32' or 'bf16' (autocast).
+                Falls back to 'fp32' when the device lacks bf16 support.
+            channels_last (bool): Store weights and backbone inputs in channels_last memory format
+            checkpoint (str): 'default' for the pre-trained weights (downloaded on first use),
+                'random' for a randomly initialized model, or a path to a local state dict
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        
         # Determine the device (GPU if available, otherwise CPU)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
+        # Use bf16 only where the hardware supports it
+        if precision == 'bf16' and not bf16_supported(self.device):
+            warnings.warn(f"bf16 is not supported on this {self.device.type}, falling back to fp32")
+            precision = 'fp32'
+        self.precision = precision
+        self.channels_last = channels_last
+        
         # Load weights and model
         self.weights = FasterRCNN_ResNet50_FPN_V2_Weights.DEFAULT
-        self.model = fasterrcnn_resnet50_fpn_v2(weights=self.weights)
+        if checkpoint == 'default':
+            self.model = fasterrcnn_resnet50_fpn_v2(weights=self.weights)
+        else:
+            # Random or local weights need no network access, e.g. for offline benchmarks
+            self.model = fasterrcnn_resnet50_fpn_v2(weights=None, weights_backbone=None,
+                                                    num_classes=len(self.weights.meta['categories']))
+            if checkpoint != 'random':
+                self.model.load_state_dict(torch.load(checkpoint, map_location='cpu'))
         
         # Set model to evaluation mode and move to the target device
         self.model.eval()
         self.model.to(self.device)
         
+        # The model batches and normalizes images itself, so the backbone input
+        # is converted right before the backbone runs
+        if channels_last:
+            self.model.to(memory_format=torch.channels_last)
+            self.model.backbone.register_forward_pre_hook(
+                lambda module, args: (args[0].contiguous(memory_format=torch.channels_last),)
+            )
+        
         # Get the list of categories (object classes)
         self.categories = self.weights.meta['categories']
 
-    def predict(self, image: Image.Image, confidence_threshold: float = 0.75, max_objects: Optional[int] = None) -> List[str]:
+    def infer(self, images: List[ImageInput]) -> List[Dict[str, torch.Tensor]]:
+        """
+        Run the model on images and return raw predictions.
+        
+        Args:
+            images (List[ImageInput]): PIL Image objects or uint8 CHW tensors to analyze
+            
+        Returns:
+            List[Dict[str, torch.Tensor]]: fp32 'boxes', 'labels' and 'scores' for each image
+        """
+        # Prepare the images; the model pads them into one batch internally
+        transform = self.weights.transforms()
+        img_tensors = [transform(image).to(self.device) for image in images]
+        
+        # Get predictions
+        with torch.no_grad(), torch.autocast(self.device.type, dtype=torch.bfloat16, enabled=self.precision == 'bf16'):
+            predictions = self.model(img_tensors)
+        
+        # Post-processing and API responses expect fp32 regardless of precision
+        return [{key: value.float() if value.is_floating_point() else value for key, value in pred.items()}
+                for pred in predictions]
+
+    def predict(self, image: ImageInput, confidence_threshold: float = 0.75, max_objects: Optional[int] = None) -> List[str]:
         """
         Detect objects in an image.
         
         Args:
-            image (Image.Image): PIL Image object to analyze
+            image (ImageInput): PIL Image object or uint8 CHW tensor to analyze
             confidence_threshold (float): Confidence threshold for filtering predictions
             max_objects (Optional[int]): Maximum number of objects to return
             
         Returns:
             List[str]: List of detected object names
         """
-        # Prepare the image
-        transform = self.weights.transforms()
-        img_tensor = transform(image).unsqueeze(0).to(self.device)
+        # Get predictions
+        predictions = self.infer([image])
+            
+        return self._extract_labels(predictions[0], confidence_threshold, max_objects)
+
+    def predict_batch(self, images: List[ImageInput], confidence_threshold: float = 0.75, max_objects: Optional[int] = None) -> List[List[str]]:
+        """
+        Detect objects in several images with a single forward pass.
+        
+        Args:
+            images (List[ImageInput]): PIL Image objects or uint8 CHW tensors to analyze
+            confidence_threshold (float): Confidence threshold for filtering predictions
+            max_objects (Optional[int]): Maximum number of objects to return per image
+            
+        Returns:
+            List[List[str]]: Detected object names for each image, in input order
+        """
+        if not images:
+            return []
         
         # Get predictions
-        with torch.no_grad():
-            predictions = self.model(img_tensor)
+        predictions = self.infer(images)
             
-        # Process predictions
-        results = []
-        pred = predictions[0]
+        return [self._extract_labels(pred, confidence_threshold, max_objects) for pred in predictions]
+
+    def _extract_labels(self, pred: Dict[str, torch.Tensor], confidence_threshold: float, max_objects: Optional[int]) -> List[str]:
+        """
+        Convert raw model output for one image into a list of object names.
+        
+        Args:
+            pred (Dict[str, torch.Tensor]): Model output with 'scores' and 'labels'
+            confidence_threshold (float): Confidence threshold for filtering predictions
+            max_objects (Optional[int]): Maximum number of objects to return
+            
+        Returns:
+            List[str]: List of detected object names sorted by confidence
+        """
         scores = pred['scores']
         labels = pred['labels']
         
@@ -67,24 +164,19 @@ class ObjectDetector:
         # Convert class indices to their names
         return [self.categories[label.item()] for label in filtered_labels]
 
-    def predict_with_confidence(self, image: Image.Image, confidence_threshold: float = 0.75) -> List[Dict[str, Union[str, float]]]:
+    def predict_with_confidence(self, image: ImageInput, confidence_threshold: float = 0.75) -> List[Dict[str, Union[str, float]]]:
         """
         Detect objects in an image with confidence scores.
         
         Args:
-            image (Image.Image): PIL Image object to analyze
+            image (ImageInput): PIL Image object or uint8 CHW tensor to analyze
             confidence_threshold (float): Confidence threshold for filtering predictions
             
         Returns:
             List[Dict[str, Union[str, float]]]: List of dictionaries containing object names and confidence scores
         """
-        # Prepare the image
-        transform = self.weights.transforms()
-        img_tensor = transform(image).unsqueeze(0).to(self.device)
-        
         # Get predictions
-        with torch.no_grad():
-            predictions = self.model(img_tensor)
+        predictions = self.infer([image])
             
         # Process predictions
         results = []
@@ -1,8 +1,10 @@
 import requests
 from PIL import Image
 from io import BytesIO
+import model
 from model import ObjectDetector
 import time
+import warnings
 
 def load_test_image(url: str) -> Image.Image:
     """Helper function to load test image"""
@@ -67,12 +69,47 @@ def test_model_performance():
     print(f"Number of objects detected: {len(objects)}")
     print(f"Running on device: {detector.device}")
 
+def test_reduced_precision():
+    """Test that bf16 autocast with channels_last detects the same objects as fp32"""
+    print("\n=== Testing reduced precision ===")
+    image = load_test_image("https://raw.githubusercontent.com/ultralytics/yolov5/master/data/images/bus.jpg")
+    fp32_objects = ObjectDetector().predict(image)
+    detector = ObjectDetector(precision="bf16", channels_last=True)
+    objects = detector.predict(image)
+    print(f"Effective precision: {detector.precision}")
+    print("fp32 objects:", fp32_objects)
+    print("Reduced precision objects:", objects)
+    assert detector.precision in ("fp32", "bf16"), "Unsupported bf16 should fall back to fp32"
+    assert set(objects) == set(fp32_objects), "Reduced precision should detect the same object classes"
+
+def test_precision_fallback():
+    """Test that unsupported bf16 falls back to fp32 with a warning and unknown precisions are rejected"""
+    print("\n=== Testing precision fallback ===")
+    original = model.bf16_supported
+    model.bf16_supported = lambda device: False
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            detector = ObjectDetector(precision="bf16", checkpoint="random")
+    finally:
+        model.bf16_supported = original
+    assert detector.precision == "fp32"
+    assert any("falling back to fp32" in str(warning.message) for warning in caught)
+
+    try:
+        ObjectDetector(precision="fp16", checkpoint="random")
+        raise AssertionError("Unknown precision should be rejected")
+    except ValueError:
+        pass
+
 def run_all_tests():
     """Run all test functions"""
     test_basic_prediction()
     test_prediction_with_confidence()
     test_prediction_with_options()
     test_model_performance()
+    test_reduced_precision()
+    test_precision_fallback()
     print("\n=== All tests completed successfully ===")
 
 if __name__ == "__main__":
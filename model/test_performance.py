@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+import torch
+from benchmark_stages import main, check_regressions, baseline_comparisons, machine_fingerprint, DEFAULT_BASELINE
+
+def test_regression_detection():
+    """Test that slowdowns and extra allocations beyond the tolerance are reported"""
+    print("\n=== Testing regression detection ===")
+    baseline = {
+        "meta": {"machine": machine_fingerprint(), "torch": torch.__version__},
+        "results": {"backbone/320x240/b1": {"median_ms": 100.0, "peak_bytes": 1000, "allocations": 10}}
+    }
+    within = {"backbone/320x240/b1": {"median_ms": 115.0, "peak_bytes": 1050, "allocations": 10}}
+    slower = {"backbone/320x240/b1": {"median_ms": 130.0, "peak_bytes": 1000, "allocations": 12}}
+    assert check_regressions(within, baseline, time_tolerance=0.2, memory_tolerance=0.1) == []
+    assert len(check_regressions(slower, baseline, time_tolerance=0.2, memory_tolerance=0.1)) == 2
+    assert len(check_regressions(slower, baseline, 0.2, 0.1, stage_tolerances={"backbone": 0.5})) == 1
+
+    # Timings from another machine are not comparable
+    baseline["meta"]["machine"] = "other"
+    assert len(check_regressions(slower, baseline, time_tolerance=0.2, memory_tolerance=0.1)) == 1
+
+    # Baselines without timings only compare memory, even when timings are forced
+    memory_only = {
+        "meta": {"machine": None, "torch": torch.__version__},
+        "results": {"backbone/320x240/b1": {"peak_bytes": 1000, "allocations": 10}}
+    }
+    assert len(check_regressions(slower, memory_only, 0.2, 0.1, force_time=True)) == 1
+    assert "threads" in machine_fingerprint(), "Thread count changes timings"
+
+def test_stage_performance():
+    """Test that no inference stage got slower or allocates more than the stored baseline"""
+    print("\n=== Testing stage performance ===")
+    # Without a comparable baseline the benchmark would run for a long time and verify nothing
+    if not os.path.exists(DEFAULT_BASELINE):
+        pytest.skip(f"No baseline at {DEFAULT_BASELINE}, record one with benchmark_stages.py --update-baseline")
+    with open(DEFAULT_BASELINE) as f:
+        meta = json.load(f).get("meta", {})
+    if not any(baseline_comparisons({"meta": meta})):
+        pytest.skip(f"Baseline was recorded on '{meta.get('machine')}' with torch {meta.get('torch')}, "
+                    f"here it is '{machine_fingerprint()}' with torch {torch.__version__}; "
+                    "record one with benchmark_stages.py --update-baseline")
+    args = [
+        "--sizes", os.environ.get("PERF_SIZES", "320x240"),
+        "--batch-sizes", os.environ.get("PERF_BATCH_SIZES", "1"),
+        "--repeats", os.environ.get("PERF_REPEATS", "3"),
+        "--time-tolerance", os.environ.get("PERF_TIME_TOLERANCE", "0.3"),
+        "--memory-tolerance", os.environ.get("PERF_MEMORY_TOLERANCE", "0.1")
+    ]
+    assert main(args) == 0, "Stage performance regressed, see REGRESSION lines above"
+
+if __name__ == "__main__":
+    test_regression_detection()
+    test_stage_performance()
+    print("\n=== All tests completed successfully ===")
@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+from typing import Dict, List
+import torch
+from torchvision.ops import box_iou
+from PIL import Image
+from model import ObjectDetector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+def load_images(directory: str) -> Dict[str, Image.Image]:
+    """Helper function to load all images from a local directory"""
+    images = {}
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            images[name] = Image.open(os.path.join(directory, name)).convert('RGB')
+    return images
+
+def match_detections(reference: Dict[str, torch.Tensor], candidate: Dict[str, torch.Tensor],
+                     iou_threshold: float) -> List[float]:
+    """
+    Greedily match candidate detections to reference detections with the same label.
+
+    Args:
+        reference (Dict[str, torch.Tensor]): fp32 predictions
+        candidate (Dict[str, torch.Tensor]): Predictions to validate
+        iou_threshold (float): Minimum IoU for two boxes to match
+
+    Returns:
+        List[float]: Absolute score differences of matched pairs
+    """
+    diffs = []
+    if len(reference['boxes']) == 0 or len(candidate['boxes']) == 0:
+        return diffs
+    ious = box_iou(reference['boxes'], candidate['boxes'])
+    same_label = reference['labels'][:, None] == candidate['labels'][None, :]
+    ious[~same_label] = 0
+
+    used = set()
+    # Reference detections are sorted by score, so stronger ones match first
+    for i in range(len(reference['boxes'])):
+        best_iou, best_j = 0.0, None
+        for j in range(len(candidate['boxes'])):
+            if j not in used and ious[i, j] >= iou_threshold and ious[i, j] > best_iou:
+                best_iou, best_j = ious[i, j].item(), j
+        if best_j is not None:
+            used.add(best_j)
+            diffs.append(abs(reference['scores'][i].item() - candidate['scores'][best_j].item()))
+    return diffs
+
+def filter_predictions(pred: Dict[str, torch.Tensor], confidence_threshold: float) -> Dict[str, torch.Tensor]:
+    """Helper function to drop low-confidence detections"""
+    mask = pred['scores'] > confidence_threshold
+    return {key: value[mask] for key, value in pred.items()}
+
+def validate(images: Dict[str, Image.Image], precision: str, channels_last: bool,
+             confidence_threshold: float, iou_threshold: float) -> float:
+    """
+    Compare detections of a reduced-precision detector against fp32.
+
+    Returns:
+        float: Recall of fp32 detections over all images
+    """
+    reference_detector = ObjectDetector()
+    candidate_detector = ObjectDetector(precision=precision, channels_last=channels_last)
+    print(f"Validating precision={candidate_detector.precision} channels_last={channels_last} "
+          f"against fp32 on {len(images)} images")
+
+    total_reference, total_candidate, total_matched, all_diffs = 0, 0, 0, []
+    for name, image in images.items():
+        reference = filter_predictions(reference_detector.infer([image])[0], confidence_threshold)
+        candidate = filter_predictions(candidate_detector.infer([image])[0], confidence_threshold)
+        diffs = match_detections(reference, candidate, iou_threshold)
+
+        total_reference += len(reference['boxes'])
+        total_candidate += len(candidate['boxes'])
+        total_matched += len(diffs)
+        all_diffs.extend(diffs)
+        print(f"- {name}: fp32={len(reference['boxes'])} candidate={len(candidate['boxes'])} "
+              f"matched={len(diffs)} max_score_diff={max(diffs, default=0.0):.4f}")
+
+    recall = total_matched / total_reference if total_reference else 1.0
+    precision_ratio = total_matched / total_candidate if total_candidate else 1.0
+    mean_diff = sum(all_diffs) / len(all_diffs) if all_diffs else 0.0
+    print(f"\nRecall vs fp32: {recall:.4f}")
+    print(f"Precision vs fp32: {precision_ratio:.4f}")
+    print(f"Mean score difference: {mean_diff:.4f}")
+    return recall
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare reduced-precision detections against fp32 on local images")
+    parser.add_argument("images", help="Directory with test images")
+    parser.add_argument("--precision", default="bf16", choices=["fp32", "bf16"])
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--confidence-threshold", type=float, default=0.5)
+    parser.add_argument("--iou-threshold", type=float, default=0.9)
+    parser.add_argument("--min-recall", type=float, default=0.95, help="Exit with an error below this recall")
+    args = parser.parse_args()
+
+    recall = validate(load_images(args.images), args.precision, args.channels_last,
+                      args.confidence_threshold, args.iou_threshold)
+    if recall < args.min_recall:
+        print(f"Recall {recall:.4f} is below {args.min_recall}")
+        sys.exit(1)
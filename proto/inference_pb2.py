@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0finference.proto\x12\tinference\"\x07\n\x05\x45mpty\"\x1d\n\x0ePredictRequest\x12\x0b\n\x03url\x18\x01 \x01(\t\"\"\n\x0fPredictResponse\x12\x0f\n\x07objects\x18\x01 \x03(\t\"Q\n\x1dPredictWithConfidenceResponse\x12\x30\n\x07objects\x18\x01 \x03(\x0b\x32\x1f.inference.ObjectWithConfidence\"9\n\x14ObjectWithConfidence\x12\r\n\x05label\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\"#\n\x13\x42\x61tchPredictRequest\x12\x0c\n\x04urls\x18\x01 \x03(\t\"F\n\x14\x42\x61tchPredictResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.inference.BatchPredictResult\"A\n\x12\x42\x61tchPredictResult\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x0f\n\x07objects\x18\x02 \x03(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"[\n\x19PredictWithOptionsRequest\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x1c\n\x14\x63onfidence_threshold\x18\x02 \x01(\x02\x12\x13\n\x0bmax_objects\x18\x03 \x01(\x05\"T\n\tModelInfo\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x0e\n\x06\x64\x65vice\x18\x03 \x01(\t\x12\x12\n\ncategories\x18\x04 \x03(\t\"6\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x14\n\x0cmodel_loaded\x18\x02 \x01(\x08\x32\xcf\x03\n\x10InstanceDetector\x12@\n\x07Predict\x12\x19.inference.PredictRequest\x1a\x1a.inference.PredictResponse\x12\\\n\x15PredictWithConfidence\x12\x19.inference.PredictRequest\x1a(.inference.PredictWithConfidenceResponse\x12O\n\x0c\x42\x61tchPredict\x12\x1e.inference.BatchPredictRequest\x1a\x1f.inference.BatchPredictResponse\x12V\n\x12PredictWithOptions\x12$.inference.PredictWithOptionsRequest\x1a\x1a.inference.PredictResponse\x12\x36\n\x0cGetModelInfo\x12\x10.inference.Empty\x1a\x14.inference.ModelInfo\x12:\n\x0bHealthCheck\x12\x10.inference.Empty\x1a\x19.inference.HealthResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0finference.proto\x12\tinference\"\x07\n\x05\x45mpty\"\x1d\n\x0ePredictRequest\x12\x0b\n\x03url\x18\x01 \x01(\t\"\"\n\x0fPredictResponse\x12\x0f\n\x07objects\x18\x01 \x03(\t\"Q\n\x1dPredictWithConfidenceResponse\x12\x30\n\x07objects\x18\x01 \x03(\x0b\x32\x1f.inference.ObjectWithConfidence\"9\n\x14ObjectWithConfidence\x12\r\n\x05label\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\"#\n\x13\x42\x61tchPredictRequest\x12\x0c\n\x04urls\x18\x01 \x03(\t\"F\n\x14\x42\x61tchPredictResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.inference.BatchPredictResult\"O\n\x12\x42\x61tchPredictResult\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x0f\n\x07objects\x18\x02 \x03(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x0c\n\x04\x63ode\x18\x04 \x01(\t\"[\n\x19PredictWithOptionsRequest\x12\x0b\n\x03url\x18\x01 \x01(\t\x12\x1c\n\x14\x63onfidence_threshold\x18\x02 \x01(\x02\x12\x13\n\x0bmax_objects\x18\x03 \x01(\x05\"g\n\tModelInfo\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x0e\n\x06\x64\x65vice\x18\x03 \x01(\t\x12\x12\n\ncategories\x18\x04 \x03(\t\x12\x11\n\tprecision\x18\x05 \x01(\t\"6\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x14\n\x0cmodel_loaded\x18\x02 \x01(\x08\"S\n\x10SubmitJobRequest\x12\x0c\n\x04urls\x18\x01 \x03(\t\x12\x1c\n\x14\x63onfidence_threshold\x18\x02 \x01(\x02\x12\x13\n\x0bmax_objects\x18\x03 \x01(\x05\"\x1c\n\nJobRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\x85\x01\n\tJobStatus\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\r\n\x05total\x18\x03 \x01(\x05\x12\x11\n\tcompleted\x18\x04 \x01(\x05\x12\x0e\n\x06\x66\x61iled\x18\x05 \x01(\x05\x12\x12\n\ncreated_at\x18\x06 \x01(\x01\x12\x12\n\nupdated_at\x18\x07 \x01(\x01\"3\n\x11JobResultsRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x05\"d\n\x12JobResultsResponse\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12.\n\x07results\x18\x03 \x03(\x0b\x32\x1d.inference.BatchPredictResult\"n\n\x11SharedMemoryImage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x0e\n\x06\x66ormat\x18\x04 \x01(\t\x12\r\n\x05width\x18\x05 \x01(\x05\x12\x0e\n\x06height\x18\x06 \x01(\x05\"|\n\x1aSharedMemoryPredictRequest\x12+\n\x05image\x18\x01 \x01(\x0b\x32\x1c.inference.SharedMemoryImage\x12\x1c\n\x14\x63onfidence_threshold\x18\x02 \x01(\x02\x12\x13\n\x0bmax_objects\x18\x03 \x01(\x05\x32\xc1\x06\n\x10InstanceDetector\x12@\n\x07Predict\x12\x19.inference.PredictRequest\x1a\x1a.inference.PredictResponse\x12\\\n\x15PredictWithConfidence\x12\x19.inference.PredictRequest\x1a(.inference.PredictWithConfidenceResponse\x12O\n\x0c\x42\x61tchPredict\x12\x1e.inference.BatchPredictRequest\x1a\x1f.inference.BatchPredictResponse\x12V\n\x12PredictWithOptions\x12$.inference.PredictWithOptionsRequest\x1a\x1a.inference.PredictResponse\x12\x36\n\x0cGetModelInfo\x12\x10.inference.Empty\x1a\x14.inference.ModelInfo\x12:\n\x0bHealthCheck\x12\x10.inference.Empty\x1a\x19.inference.HealthResponse\x12>\n\tSubmitJob\x12\x1b.inference.SubmitJobRequest\x1a\x14.inference.JobStatus\x12\x35\n\x06GetJob\x12\x15.inference.JobRequest\x1a\x14.inference.JobStatus\x12L\n\rGetJobResults\x12\x1c.inference.JobResultsRequest\x1a\x1d.inference.JobResultsResponse\x12Q\n\x10StreamJobResults\x12\x1c.inference.JobResultsRequest\x1a\x1d.inference.BatchPredictResult0\x01\x12X\n\x13PredictSharedMemory\x12%.inference.SharedMemoryPredictRequest\x1a\x1a.inference.PredictResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -46,13 +46,27 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_BATCHPREDICTRESPONSE']._serialized_start=285
   _globals['_BATCHPREDICTRESPONSE']._serialized_end=355
   _globals['_BATCHPREDICTRESULT']._serialized_start=357
-  _globals['_BATCHPREDICTRESULT']._serialized_end=422
-  _globals['_PREDICTWITHOPTIONSREQUEST']._serialized_start=424
-  _globals['_PREDICTWITHOPTIONSREQUEST']._serialized_end=515
-  _globals['_MODELINFO']._serialized_start=517
-  _globals['_MODELINFO']._serialized_end=601
-  _globals['_HEALTHRESPONSE']._serialized_start=603
-  _globals['_HEALTHRESPONSE']._serialized_end=657
-  _globals['_INSTANCEDETECTOR']._serialized_start=660
-  _globals['_INSTANCEDETECTOR']._serialized_end=1123
+  _globals['_BATCHPREDICTRESULT']._serialized_end=436
+  _globals['_PREDICTWITHOPTIONSREQUEST']._serialized_start=438
+  _globals['_PREDICTWITHOPTIONSREQUEST']._serialized_end=529
+  _globals['_MODELINFO']._serialized_start=531
+  _globals['_MODELINFO']._serialized_end=634
+  _globals['_HEALTHRESPONSE']._serialized_start=636
+  _globals['_HEALTHRESPONSE']._serialized_end=690
+  _globals['_SUBMITJOBREQUEST']._serialized_start=692
+  _globals['_SUBMITJOBREQUEST']._serialized_end=775
+  _globals['_JOBREQUEST']._serialized_start=777
+  _globals['_JOBREQUEST']._serialized_end=805
+  _globals['_JOBSTATUS']._serialized_start=808
+  _globals['_JOBSTATUS']._serialized_end=941
+  _globals['_JOBRESULTSREQUEST']._serialized_start=943
+  _globals['_JOBRESULTSREQUEST']._serialized_end=994
+  _globals['_JOBRESULTSRESPONSE']._serialized_start=996
+  _globals['_JOBRESULTSRESPONSE']._serialized_end=1096
+  _globals['_SHAREDMEMORYIMAGE']._serialized_start=1098
+  _globals['_SHAREDMEMORYIMAGE']._serialized_end=1208
+  _globals['_SHAREDMEMORYPREDICTREQUEST']._serialized_start=1210
+  _globals['_SHAREDMEMORYPREDICTREQUEST']._serialized_end=1334
+  _globals['_INSTANCEDETECTOR']._serialized_start=1337
+  _globals['_INSTANCEDETECTOR']._serialized_end=2170
 # @@protoc_insertion_point(module_scope)
@@ -64,43 +64,109 @@ class InstanceDetectorStub(object):
                 request_serializer=inference__pb2.Empty.SerializeToString,
                 response_deserializer=inference__pb2.HealthResponse.FromString,
                 _registered_method=True)
+        self.SubmitJob = channel.unary_unary(
+                '/inference.InstanceDetector/SubmitJob',
+                request_serializer=inference__pb2.SubmitJobRequest.SerializeToString,
+                response_deserializer=inference__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.GetJob = channel.unary_unary(
+                '/inference.InstanceDetector/GetJob',
+                request_serializer=inference__pb2.JobRequest.SerializeToString,
+                response_deserializer=inference__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.GetJobResults = channel.unary_unary(
+                '/inference.InstanceDetector/GetJobResults',
+                request_serializer=inference__pb2.JobResultsRequest.SerializeToString,
+                response_deserializer=inference__pb2.JobResultsResponse.FromString,
+                _registered_method=True)
+        self.StreamJobResults = channel.unary_stream(
+                '/inference.InstanceDetector/StreamJobResults',
+                request_serializer=inference__pb2.JobResultsRequest.SerializeToString,
+                response_deserializer=inference__pb2.BatchPredictResult.FromString,
+                _registered_method=True)
+        self.PredictSharedMemory = channel.unary_unary(
+                '/inference.InstanceDetector/PredictSharedMemory',
+                request_serializer=inference__pb2.SharedMemoryPredictRequest.SerializeToString,
+                response_deserializer=inference__pb2.PredictResponse.FromString,
+                _registered_method=True)
 
 
 class InstanceDetectorServicer(object):
     """Missing associated documentation comment in .proto file."""
 
     def Predict(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Basic prediction
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def PredictWithConfidence(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Prediction with confidence scores
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def BatchPredict(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Batch prediction
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def PredictWithOptions(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Prediction with custom options
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def GetModelInfo(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Get model information
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def HealthCheck(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Health check
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitJob(self, request, context):
+        """Submit a batch job that is processed in the background
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJob(self, request, context):
+        """Get job state and progress
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJobResults(self, request, context):
+        """Get results finished so far
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamJobResults(self, request, context):
+        """Stream results as they are finished
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PredictSharedMemory(self, request, context):
+        """Prediction for an image in a shared memory segment of a co-located client
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -138,10 +204,36 @@ def add_InstanceDetectorServicer_to_server(servicer, server):
                     request_deserializer=inference__pb2.Empty.FromString,
                     response_serializer=inference__pb2.HealthResponse.SerializeToString,
             ),
+            'SubmitJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitJob,
+                    request_deserializer=inference__pb2.SubmitJobRequest.FromString,
+                    response_serializer=inference__pb2.JobStatus.SerializeToString,
+            ),
+            'GetJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJob,
+                    request_deserializer=inference__pb2.JobRequest.FromString,
+                    response_serializer=inference__pb2.JobStatus.SerializeToString,
+            ),
+            'GetJobResults': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJobResults,
+                    request_deserializer=inference__pb2.JobResultsRequest.FromString,
+                    response_serializer=inference__pb2.JobResultsResponse.SerializeToString,
+            ),
+            'StreamJobResults': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamJobResults,
+                    request_deserializer=inference__pb2.JobResultsRequest.FromString,
+                    response_serializer=inference__pb2.BatchPredictResult.SerializeToString,
+            ),
+            'PredictSharedMemory': grpc.unary_unary_rpc_method_handler(
+                    servicer.PredictSharedMemory,
+                    request_deserializer=inference__pb2.SharedMemoryPredictRequest.FromString,
+                    response_serializer=inference__pb2.PredictResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'inference.InstanceDetector', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('inference.InstanceDetector', rpc_method_handlers)
 
 
  # This class is part of an EXPERIMENTAL API.
@@ -159,13 +251,21 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/Predict',
-                inference__pb2.PredictRequest.SerializeToString,
-                inference__pb2.PredictResponse.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/Predict',
+            inference__pb2.PredictRequest.SerializeToString,
+            inference__pb2.PredictResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def PredictWithConfidence(request,
@@ -178,13 +278,21 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/PredictWithConfidence',
-                inference__pb2.PredictRequest.SerializeToString,
-                inference__pb2.PredictWithConfidenceResponse.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/PredictWithConfidence',
+            inference__pb2.PredictRequest.SerializeToString,
+            inference__pb2.PredictWithConfidenceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def BatchPredict(request,
@@ -197,13 +305,21 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/BatchPredict',
-                inference__pb2.BatchPredictRequest.SerializeToString,
-                inference__pb2.BatchPredictResponse.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/BatchPredict',
+            inference__pb2.BatchPredictRequest.SerializeToString,
+            inference__pb2.BatchPredictResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def PredictWithOptions(request,
@@ -216,13 +332,21 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/PredictWithOptions',
-                inference__pb2.PredictWithOptionsRequest.SerializeToString,
-                inference__pb2.PredictResponse.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/PredictWithOptions',
+            inference__pb2.PredictWithOptionsRequest.SerializeToString,
+            inference__pb2.PredictResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def GetModelInfo(request,
@@ -235,13 +359,21 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/GetModelInfo',
-                inference__pb2.Empty.SerializeToString,
-                inference__pb2.ModelInfo.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/GetModelInfo',
+            inference__pb2.Empty.SerializeToString,
+            inference__pb2.ModelInfo.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
 
     @staticmethod
     def HealthCheck(request,
@@ -254,10 +386,153 @@ class InstanceDetector(object):
             wait_for_ready=None,
             timeout=None,
             metadata=None):
-        return grpc.experimental.unary_unary(request,
-                target,
-                '/inference.InstanceDetector/HealthCheck',
-                inference__pb2.Empty.SerializeToString,
-                inference__pb2.HealthResponse.FromString,
-                options, channel_credentials,
-                insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/HealthCheck',
+            inference__pb2.Empty.SerializeToString,
+            inference__pb2.HealthResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/SubmitJob',
+            inference__pb2.SubmitJobRequest.SerializeToString,
+            inference__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/GetJob',
+            inference__pb2.JobRequest.SerializeToString,
+            inference__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJobResults(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/GetJobResults',
+            inference__pb2.JobResultsRequest.SerializeToString,
+            inference__pb2.JobResultsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamJobResults(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/inference.InstanceDetector/StreamJobResults',
+            inference__pb2.JobResultsRequest.SerializeToString,
+            inference__pb2.BatchPredictResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PredictSharedMemory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/inference.InstanceDetector/PredictSharedMemory',
+            inference__pb2.SharedMemoryPredictRequest.SerializeToString,
+            inference__pb2.PredictResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,50 +1,78 @@
 import grpc
 from concurrent import futures
+import threading
 import time
 import sys
 import os
-import requests
-from PIL import Image
-from io import BytesIO
+from prometheus_client import start_http_server
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from model.model import ObjectDetector
+from server.jobs import JobStore, JobManager
+from server.images import fetch_image, ImageRejectedError, ReservedImage
+from server.shared_memory import SharedImage
 from proto import inference_pb2
 from proto import inference_pb2_grpc
 
+# Each open job stream holds a worker thread until its job is completed, so streams get their own
+# workers on top of the ones for other RPCs; more concurrent streams are refused
+GRPC_WORKERS = int(os.environ.get("GRPC_WORKERS", "10"))
+MAX_JOB_STREAMS = int(os.environ.get("MAX_JOB_STREAMS", "4"))
+
 class InstanceDetectorServicer(inference_pb2_grpc.InstanceDetectorServicer):
     def __init__(self):
-        self.model = ObjectDetector()
+        self.model = ObjectDetector(
+            precision=os.environ.get("MODEL_PRECISION", "fp32"),
+            channels_last=os.environ.get("MODEL_CHANNELS_LAST") == "1",
+            checkpoint=os.environ.get("MODEL_CHECKPOINT", "default")
+        )
+        self.jobs = JobManager(
+            self.model,
+            JobStore(os.environ.get("JOBS_DB_PATH", "grpc_jobs.db")),
+            self.download_image,
+            retention=float(os.environ.get("JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+        )
+        self.job_streams = threading.BoundedSemaphore(MAX_JOB_STREAMS)
 
-    def download_image(self, url: str) -> Image.Image:
+    def download_image(self, url: str) -> ReservedImage:
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return Image.open(BytesIO(response.content))
+            return fetch_image(url)
+        except ImageRejectedError:
+            raise
         except Exception as e:
             raise grpc.RpcError(grpc.StatusCode.INVALID_ARGUMENT, f"Failed to download image: {str(e)}")
 
+    def error_code(self, error: Exception) -> grpc.StatusCode:
+        if isinstance(error, ImageRejectedError):
+            if error.reason == "budget":
+                return grpc.StatusCode.RESOURCE_EXHAUSTED
+            return grpc.StatusCode.INVALID_ARGUMENT
+        # Missing segment, a range outside of it or data that is not an image
+        if isinstance(error, (FileNotFoundError, ValueError)):
+            return grpc.StatusCode.INVALID_ARGUMENT
+        return grpc.StatusCode.INTERNAL
+
     def Predict(self, request, context):
         try:
-            image = self.download_image(request.url)
-            objects = self.model.predict(image)
+            with self.download_image(request.url) as image:
+                objects = self.model.predict(image)
             return inference_pb2.PredictResponse(objects=objects)
         except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_code(self.error_code(e))
             context.set_details(str(e))
             return inference_pb2.PredictResponse()
 
     def PredictWithConfidence(self, request, context):
         try:
-            image = self.download_image(request.url)
-            predictions = self.model.predict_with_confidence(image)
+            with self.download_image(request.url) as image:
+                predictions = self.model.predict_with_confidence(image)
             objects = [
                 inference_pb2.ObjectWithConfidence(label=pred["label"], confidence=pred["confidence"])
                 for pred in predictions
             ]
             return inference_pb2.PredictWithConfidenceResponse(objects=objects)
         except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_code(self.error_code(e))
             context.set_details(str(e))
             return inference_pb2.PredictWithConfidenceResponse()
 
@@ -52,28 +80,28 @@ class InstanceDetectorServicer(inference_pb2_grpc.InstanceDetectorServicer):
         results = []
         for url in request.urls:
             try:
-                image = self.download_image(url)
-                objects = self.model.predict(image)
+                with self.download_image(url) as image:
+                    objects = self.model.predict(image)
                 results.append(
                     inference_pb2.BatchPredictResult(url=url, objects=objects)
                 )
             except Exception as e:
                 results.append(
-                    inference_pb2.BatchPredictResult(url=url, error=str(e))
+                    inference_pb2.BatchPredictResult(url=url, error=str(e), code=self.error_code(e).name)
                 )
         return inference_pb2.BatchPredictResponse(results=results)
 
     def PredictWithOptions(self, request, context):
         try:
-            image = self.download_image(request.url)
-            objects = self.model.predict(
-                image,
-                confidence_threshold=request.confidence_threshold,
-                max_objects=request.max_objects
-            )
+            with self.download_image(request.url) as image:
+                objects = self.model.predict(
+                    image,
+                    confidence_threshold=request.confidence_threshold,
+                    max_objects=request.max_objects or None
+                )
             return inference_pb2.PredictResponse(objects=objects)
         except Exception as e:
-            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_code(self.error_code(e))
             context.set_details(str(e))
             return inference_pb2.PredictResponse()
 
@@ -82,6 +110,7 @@ class InstanceDetectorServicer(inference_pb2_grpc.InstanceDetectorServicer):
             model_name="Faster R-CNN",
             version="1.0",
             device=self.model.device.type,
+            precision=self.model.precision,
             categories=self.model.categories
         )
 
@@ -91,14 +120,97 @@ class InstanceDetectorServicer(inference_pb2_grpc.InstanceDetectorServicer):
             model_loaded=True
         )
 
+    def SubmitJob(self, request, context):
+        job = self.jobs.submit(
+            list(request.urls),
+            confidence_threshold=request.confidence_threshold or 0.75,
+            max_objects=request.max_objects or None
+        )
+        return self._job_status(job)
+
+    def GetJob(self, request, context):
+        job = self.jobs.store.get_job(request.job_id)
+        if job is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Job {request.job_id} not found")
+        return self._job_status(job)
+
+    def GetJobResults(self, request, context):
+        job = self.jobs.store.get_job(request.job_id)
+        if job is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Job {request.job_id} not found")
+        results = self.jobs.store.get_results(request.job_id, request.offset)
+        return inference_pb2.JobResultsResponse(
+            job_id=request.job_id,
+            status=job["status"],
+            results=[inference_pb2.BatchPredictResult(**result) for result in results]
+        )
+
+    def StreamJobResults(self, request, context):
+        if self.jobs.store.get_job(request.job_id) is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Job {request.job_id} not found")
+        if not self.job_streams.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"{MAX_JOB_STREAMS} job streams are already open, poll GetJobResults instead")
+        try:
+            for result in self.jobs.stream_results(request.job_id, request.offset):
+                if not context.is_active():
+                    return
+                yield inference_pb2.BatchPredictResult(**result)
+        finally:
+            self.job_streams.release()
+
+    def PredictSharedMemory(self, request, context):
+        if not context.peer().startswith("unix:"):
+            context.abort(grpc.StatusCode.PERMISSION_DENIED,
+                          "Shared memory requests are only accepted on the Unix domain socket")
+        try:
+            image = request.image
+            with SharedImage(image.name, image.offset, image.size, image.format,
+                             width=image.width, height=image.height) as shared:
+                objects = self.model.predict(
+                    shared.image,
+                    confidence_threshold=request.confidence_threshold or 0.75,
+                    max_objects=request.max_objects or None
+                )
+            return inference_pb2.PredictResponse(objects=objects)
+        except Exception as e:
+            context.set_code(self.error_code(e))
+            context.set_details(str(e))
+            return inference_pb2.PredictResponse()
+
+    def _job_status(self, job):
+        return inference_pb2.JobStatus(
+            job_id=job["job_id"],
+            status=job["status"],
+            total=job["total"],
+            completed=job["completed"],
+            failed=job["failed"],
+            created_at=job["created_at"],
+            updated_at=job["updated_at"]
+        )
+
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Expose Prometheus metrics (job throughput and backlog) over HTTP
+    start_http_server(int(os.environ.get("METRICS_PORT", "9091")))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=GRPC_WORKERS + MAX_JOB_STREAMS), options=[
+        # Let pooled client connections send keep-alive pings while idle, see client/channels.py
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.min_ping_interval_without_data_ms", 10000)
+    ])
     inference_pb2_grpc.add_InstanceDetectorServicer_to_server(
         InstanceDetectorServicer(), server
     )
-    server.add_insecure_port('[::]:9090')
+    port = int(os.environ.get("GRPC_PORT", "9090"))
+    server.add_insecure_port(f'[::]:{port}')
+    # Co-located clients can skip the TCP stack through a Unix domain socket
+    uds_path = os.environ.get("GRPC_UDS_PATH")
+    if uds_path:
+        if os.path.exists(uds_path):
+            os.unlink(uds_path)
+        server.add_insecure_port(f'unix:{uds_path}')
+        os.chmod(uds_path, int(os.environ.get("UDS_MODE", "600"), 8))
     server.start()
-    print("gRPC server started on port 9090")
+    print(f"gRPC server started on port {port}" + (f" and {uds_path}" if uds_path else ""))
     try:
         while True:
             time.sleep(86400)
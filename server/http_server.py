@@ -1,18 +1,22 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, HttpUrl
-import requests
-from PIL import Image
-from io import BytesIO
 import sys
 import os
 import time
 from typing import List, Dict, Union, Optional
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import json
+import socket
+import threading
 import uvicorn
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from model.model import ObjectDetector
+from server.jobs import JobStore, JobManager
+from server.images import fetch_image, ImageRejectedError, ReservedImage
+from server.shared_memory import SharedImage
 
 app = FastAPI(
     title="Object Detection API",
@@ -23,7 +27,19 @@ app = FastAPI(
 )
 
 # Initialize model
-model = ObjectDetector()
+model = ObjectDetector(
+    precision=os.environ.get("MODEL_PRECISION", "fp32"),
+    channels_last=os.environ.get("MODEL_CHANNELS_LAST") == "1",
+    checkpoint=os.environ.get("MODEL_CHECKPOINT", "default")
+)
+
+# Optional Unix domain socket for co-located clients; shared memory requests are only accepted there
+UDS_PATH = os.environ.get("HTTP_UDS_PATH")
+
+# Streams wait for job results in the thread pool shared with inference handlers, so their number is
+# limited to keep threads for other requests; more concurrent streams are refused
+MAX_JOB_STREAMS = int(os.environ.get("MAX_JOB_STREAMS", "4"))
+job_streams = threading.BoundedSemaphore(MAX_JOB_STREAMS)
 
 # Define Prometheus metrics
 INFERENCE_COUNT = Counter('app_http_inference_count_total', 'Number of HTTP endpoint invocations')
@@ -46,14 +62,82 @@ class PredictRequestWithOptions(PredictRequest):
     confidence_threshold: float = 0.75
     max_objects: Optional[int] = None
 
-def download_image(url: str) -> Image.Image:
+class SubmitJobRequest(BatchPredictRequest):
+    confidence_threshold: float = 0.75
+    max_objects: Optional[int] = None
+
+class SharedMemoryImage(BaseModel):
+    name: str
+    offset: int = 0
+    size: int
+    format: str = "encoded"
+    width: int = 0
+    height: int = 0
+
+class SharedMemoryPredictRequest(BaseModel):
+    image: SharedMemoryImage
+    confidence_threshold: float = 0.75
+    max_objects: Optional[int] = None
+
+def download_image(url: str) -> ReservedImage:
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return Image.open(BytesIO(response.content))
+        return fetch_image(url)
+    except ImageRejectedError as e:
+        raise HTTPException(status_code=503 if e.reason == "budget" else 413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to download image: {str(e)}")
 
+def open_shared_image(image: SharedMemoryImage) -> SharedImage:
+    try:
+        return SharedImage(image.name, image.offset, image.size, image.format,
+                           width=image.width, height=image.height)
+    except ImageRejectedError as e:
+        raise HTTPException(status_code=503 if e.reason == "budget" else 413, detail=str(e))
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid shared memory image: {str(e)}")
+
+def download_job_image(url: str) -> ReservedImage:
+    # Jobs keep items rejected for lack of memory pending, so they need the original rejection
+    try:
+        return fetch_image(url)
+    except ImageRejectedError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to download image: {str(e)}")
+
+# Background jobs for large batches; state survives restarts
+jobs = JobManager(model, JobStore(os.environ.get("JOBS_DB_PATH", "http_jobs.db")), download_job_image,
+                  retention=float(os.environ.get("JOB_RETENTION_SECONDS", 7 * 24 * 3600)))
+
+def get_job_or_404(job_id: str) -> Dict:
+    job = jobs.store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+class JobStreamResponse(StreamingResponse):
+    """Response streaming job results as NDJSON, which holds a job stream slot until it ends"""
+    def __init__(self, job_id: str, offset: int, disconnect_poll_interval: float = 1.0):
+        self.stop = threading.Event()
+        self.disconnect_poll_interval = disconnect_poll_interval
+        results = jobs.stream_results(job_id, offset, stop=self.stop)
+        super().__init__((json.dumps(result) + "\n" for result in results), media_type="application/x-ndjson")
+
+    async def watch_disconnect(self, request: Request):
+        # Nothing is sent while waiting for results, so a disconnect would go unnoticed until the next one
+        while not await request.is_disconnected():
+            await asyncio.sleep(self.disconnect_poll_interval)
+        self.stop.set()
+
+    async def __call__(self, scope, receive, send):
+        watcher = asyncio.ensure_future(self.watch_disconnect(Request(scope, receive)))
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.stop.set()
+            watcher.cancel()
+            job_streams.release()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "model_loaded": True}
@@ -64,56 +148,137 @@ async def model_info():
         "model_name": "Faster R-CNN",
         "version": "1.0",
         "device": model.device.type,
+        "precision": model.precision,
         "categories": model.categories
     }
 
+# Handlers that download images, run the model or query the job database are plain functions:
+# FastAPI runs them in its thread pool, so waiting for the image memory budget or for inference
+# does not block the event loop and other requests, including the ones that release memory
+
 @app.post("/predict", response_model=PredictResponse)
-async def predict(request: PredictRequest):
+def predict(request: PredictRequest):
     try:
         INFERENCE_COUNT.inc()
         with PREDICTION_TIME.time():
-            image = download_image(str(request.url))
-            objects = model.predict(image)
+            with download_image(str(request.url)) as image:
+                objects = model.predict(image)
             return PredictResponse(objects=objects)
+    except HTTPException:
+        PREDICTION_ERRORS.inc()
+        raise
     except Exception as e:
         PREDICTION_ERRORS.inc()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/batch_predict")
-async def batch_predict(request: BatchPredictRequest):
+def batch_predict(request: BatchPredictRequest):
     results = []
     for url in request.urls:
         try:
-            image = download_image(str(url))
-            objects = model.predict(image)
+            with download_image(str(url)) as image:
+                objects = model.predict(image)
             results.append({"url": str(url), "objects": objects})
         except Exception as e:
             results.append({"url": str(url), "error": str(e)})
     return {"results": results}
 
 @app.post("/predict_with_confidence", response_model=PredictResponseWithConfidence)
-async def predict_with_confidence(request: PredictRequest):
+def predict_with_confidence(request: PredictRequest):
     try:
-        image = download_image(str(request.url))
-        predictions = model.predict_with_confidence(image)
+        with download_image(str(request.url)) as image:
+            predictions = model.predict_with_confidence(image)
         return PredictResponseWithConfidence(objects=predictions)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predict_with_options", response_model=PredictResponse)
-async def predict_with_options(request: PredictRequestWithOptions):
+def predict_with_options(request: PredictRequestWithOptions):
     try:
-        image = download_image(str(request.url))
-        objects = model.predict(image, 
-                              confidence_threshold=request.confidence_threshold,
-                              max_objects=request.max_objects)
+        with download_image(str(request.url)) as image:
+            objects = model.predict(image, 
+                                  confidence_threshold=request.confidence_threshold,
+                                  max_objects=request.max_objects)
         return PredictResponse(objects=objects)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict_shared_memory", response_model=PredictResponse)
+def predict_shared_memory(request: SharedMemoryPredictRequest, http_request: Request):
+    server = http_request.scope.get("server")
+    if UDS_PATH is None or server is None or server[0] != UDS_PATH:
+        raise HTTPException(status_code=403,
+                            detail="Shared memory requests are only accepted on the Unix domain socket")
+    try:
+        INFERENCE_COUNT.inc()
+        with PREDICTION_TIME.time():
+            with open_shared_image(request.image) as shared:
+                objects = model.predict(shared.image,
+                                        confidence_threshold=request.confidence_threshold,
+                                        max_objects=request.max_objects)
+            return PredictResponse(objects=objects)
+    except HTTPException:
+        PREDICTION_ERRORS.inc()
+        raise
+    except Exception as e:
+        PREDICTION_ERRORS.inc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs")
+def submit_job(request: SubmitJobRequest):
+    return jobs.submit([str(url) for url in request.urls],
+                       confidence_threshold=request.confidence_threshold,
+                       max_objects=request.max_objects)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return get_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/results")
+def get_job_results(job_id: str, offset: int = 0):
+    job = get_job_or_404(job_id)
+    return {"job_id": job_id, "status": job["status"], "results": jobs.store.get_results(job_id, offset)}
+
+@app.get("/jobs/{job_id}/stream")
+def stream_job_results(job_id: str, offset: int = 0):
+    get_job_or_404(job_id)
+    if not job_streams.acquire(blocking=False):
+        raise HTTPException(status_code=429,
+                            detail=f"{MAX_JOB_STREAMS} job streams are already open, "
+                                   f"poll /jobs/{job_id}/results instead")
+    try:
+        return JobStreamResponse(job_id, offset)
+    except Exception:
+        job_streams.release()
+        raise
+
 @app.get("/metrics")
 async def metrics():
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
+def serve():
+    config = uvicorn.Config(app, host="0.0.0.0", port=int(os.environ.get("HTTP_PORT", "8080")))
+    sockets = [config.bind_socket()]
+    if UDS_PATH:
+        if os.path.exists(UDS_PATH):
+            os.unlink(UDS_PATH)
+        # Bound here because uvicorn makes its sockets accessible to every user
+        uds = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        uds.bind(UDS_PATH)
+        os.chmod(UDS_PATH, int(os.environ.get("UDS_MODE", "600"), 8))
+        uds.listen(2048)
+        sockets.append(uds)
+    try:
+        uvicorn.Server(config).run(sockets=sockets)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if UDS_PATH and os.path.exists(UDS_PATH):
+            os.unlink(UDS_PATH)
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8080) 
\ No newline at end of file
+    serve()
@@ -0,0 +1,242 @@
+import os
+import threading
+from io import BytesIO
+from typing import BinaryIO, Optional, Tuple
+
+import requests
+from PIL import Image, UnidentifiedImageError
+from prometheus_client import Counter, Gauge
+
+# Limits, configurable through environment variables
+MAX_IMAGE_BYTES = int(os.environ.get("MAX_IMAGE_BYTES", 20 * 1024 * 1024))
+MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", 40_000_000))
+IMAGE_MEMORY_BUDGET = int(os.environ.get("IMAGE_MEMORY_BUDGET", 1024 * 1024 * 1024))
+BUDGET_WAIT_TIMEOUT = float(os.environ.get("IMAGE_BUDGET_WAIT_TIMEOUT", 5.0))
+DOWNLOAD_TIMEOUT = float(os.environ.get("IMAGE_DOWNLOAD_TIMEOUT", 30.0))
+CHUNK_SIZE = 64 * 1024
+
+# Memory held per pixel: decoded RGB bytes plus the float32 tensor built from them
+BYTES_PER_PIXEL = 3 + 3 * 4
+
+# Make PIL refuse decompression bombs instead of only warning about them
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+# Define Prometheus metrics
+IMAGES_REJECTED = Counter('app_images_rejected_total', 'Number of images rejected by ingestion limits', ['reason'])
+IMAGE_BYTES_IN_FLIGHT = Gauge('app_image_bytes_in_flight', 'Estimated memory held by images being processed')
+
+
+class ImageRejectedError(Exception):
+    """
+    Raised when an image is refused to protect server memory.
+    The reason is one of 'bytes', 'pixels', 'too_large' (more than the whole budget) or 'budget';
+    only 'budget' is temporary, the other images will never be accepted.
+    """
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class MemoryBudget:
+    def __init__(self, capacity: int, timeout: float = BUDGET_WAIT_TIMEOUT):
+        """
+        Initialize the memory budget shared by all requests of the process.
+
+        Args:
+            capacity (int): Total number of bytes that may be reserved at once
+            timeout (float): Maximum time to wait for a reservation in seconds
+        """
+        self.capacity = capacity
+        self.timeout = timeout
+        self.used = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size: int) -> bool:
+        """
+        Reserve memory, waiting for other requests to release it if necessary.
+
+        Args:
+            size (int): Number of bytes to reserve
+
+        Returns:
+            bool: True if the memory was reserved
+        """
+        if size > self.capacity:
+            return False
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.used + size <= self.capacity, self.timeout):
+                return False
+            self.used += size
+            IMAGE_BYTES_IN_FLIGHT.inc(size)
+            return True
+
+    def release(self, size: int):
+        """Return previously reserved memory to the budget"""
+        with self.condition:
+            self.used -= size
+            IMAGE_BYTES_IN_FLIGHT.dec(size)
+            self.condition.notify_all()
+
+
+image_budget = MemoryBudget(IMAGE_MEMORY_BUDGET)
+
+
+class ReservedImage:
+    """Decoded RGB image that holds its memory reservation until closed"""
+    def __init__(self, image: Image.Image, size: int, budget: MemoryBudget):
+        self.image = image
+        self.size = size
+        self.budget = budget
+
+    def close(self):
+        if self.image is not None:
+            self.image = None
+            self.budget.release(self.size)
+
+    def __enter__(self) -> Image.Image:
+        return self.image
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def reserve(budget: MemoryBudget, size: int, held: int = 0):
+    """
+    Reserve memory for an image, waiting for other requests to release it if necessary.
+
+    Args:
+        budget (MemoryBudget): Budget to reserve memory from
+        size (int): Number of bytes to reserve
+        held (int): Number of bytes already reserved for the same image
+
+    Raises:
+        ImageRejectedError: If the image can never fit into the budget, or no memory is released in time
+    """
+    if held + size > budget.capacity:
+        # Waiting would not help, the image would never fit
+        IMAGES_REJECTED.labels(reason="too_large").inc()
+        raise ImageRejectedError(f"Image needs {held + size} bytes, more than the memory budget of {budget.capacity}",
+                                 "too_large")
+    if not budget.acquire(size):
+        IMAGES_REJECTED.labels(reason="budget").inc()
+        raise ImageRejectedError("Server is out of memory for images, retry later", "budget")
+
+
+def check_pixels(width: int, height: int, max_pixels: int):
+    """Reject an image with more pixels than the limit"""
+    if width * height > max_pixels:
+        IMAGES_REJECTED.labels(reason="pixels").inc()
+        raise ImageRejectedError(f"Image is {width}x{height} pixels, limit is {max_pixels}", "pixels")
+
+
+def open_image(data: BinaryIO) -> Image.Image:
+    """
+    Open an encoded image without decoding its pixels.
+    Image.open only parses the header, so this is cheap even for huge images.
+
+    Args:
+        data (BinaryIO): Encoded image
+
+    Returns:
+        Image.Image: Lazily decoded image
+
+    Raises:
+        ImageRejectedError: If the image is a decompression bomb
+        ValueError: If the data is not an image
+    """
+    try:
+        return Image.open(data)
+    except Image.DecompressionBombError as e:
+        IMAGES_REJECTED.labels(reason="pixels").inc()
+        raise ImageRejectedError(str(e), "pixels")
+    except UnidentifiedImageError as e:
+        raise ValueError(str(e))
+
+
+def read_limited(url: str, max_bytes: int, budget: MemoryBudget) -> Tuple[BytesIO, int]:
+    """
+    Download a resource in chunks, stopping as soon as it exceeds the byte limit.
+    Memory for the download is reserved before it starts: the Content-Length if known,
+    otherwise the byte limit, and shrunk to the actual size afterwards.
+
+    Args:
+        url (str): URL of the image
+        max_bytes (int): Maximum allowed size of the encoded image
+        budget (MemoryBudget): Budget to reserve memory from
+
+    Returns:
+        Tuple[BytesIO, int]: Encoded image and the number of bytes reserved for it, which the caller must release
+    """
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+
+        content_length = response.headers.get("Content-Length")
+        if content_length is not None and int(content_length) > max_bytes:
+            IMAGES_REJECTED.labels(reason="bytes").inc()
+            raise ImageRejectedError(f"Image is {content_length} bytes, limit is {max_bytes}", "bytes")
+
+        # Compressed responses are decoded while reading, so their Content-Length is not the size in memory
+        if content_length is not None and not response.headers.get("Content-Encoding"):
+            reserved = int(content_length)
+        else:
+            reserved = min(max_bytes, budget.capacity)
+        reserve(budget, reserved)
+        try:
+            data = BytesIO()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                data.write(chunk)
+                if data.tell() > max_bytes:
+                    IMAGES_REJECTED.labels(reason="bytes").inc()
+                    raise ImageRejectedError(f"Image exceeds {max_bytes} bytes", "bytes")
+                if data.tell() > reserved:
+                    reserve(budget, data.tell() - reserved, reserved)
+                    reserved = data.tell()
+        except Exception:
+            budget.release(reserved)
+            raise
+        size = data.tell()
+        budget.release(reserved - size)
+        data.seek(0)
+        return data, size
+
+
+def fetch_image(url: str, max_bytes: Optional[int] = None, max_pixels: Optional[int] = None,
+                budget: Optional[MemoryBudget] = None) -> ReservedImage:
+    """
+    Download and decode an image within the configured memory limits.
+    The download is reserved from the shared budget while it is read, dimensions are
+    checked from the header before the image is decoded, and the estimated memory of
+    the decoded image is reserved before decoding.
+
+    Args:
+        url (str): URL of the image
+        max_bytes (Optional[int]): Maximum size of the encoded image
+        max_pixels (Optional[int]): Maximum number of pixels of the decoded image
+        budget (Optional[MemoryBudget]): Budget to reserve memory from
+
+    Returns:
+        ReservedImage: Decoded image; close it (or use it as a context manager) to release memory
+    """
+    max_bytes = MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    max_pixels = MAX_IMAGE_PIXELS if max_pixels is None else max_pixels
+    budget = image_budget if budget is None else budget
+
+    data, data_size = read_limited(url, max_bytes, budget)
+    try:
+        image = open_image(data)
+        check_pixels(image.width, image.height, max_pixels)
+        # The encoded image stays reserved until it is decoded
+        size = image.width * image.height * BYTES_PER_PIXEL
+        reserve(budget, size, data_size)
+    except Exception:
+        budget.release(data_size)
+        raise
+    try:
+        image = image.convert('RGB')
+    except Exception:
+        budget.release(data_size + size)
+        raise
+    finally:
+        data.close()
+    budget.release(data_size)
+    return ReservedImage(image, size, budget)
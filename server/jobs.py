@@ -0,0 +1,457 @@
+import json
+import contextlib
+import sqlite3
+import threading
+import queue
+import time
+import uuid
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional
+
+from PIL import Image
+from prometheus_client import Counter, Gauge, Histogram
+
+from server.images import ImageRejectedError
+
+# Job states; a job that cannot be processed ends as FAILED
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+
+# Item states
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Attempts to process a job before it is given up, e.g. after database errors
+MAX_JOB_ATTEMPTS = 3
+
+# Define Prometheus metrics
+JOBS_SUBMITTED = Counter('app_jobs_submitted_total', 'Number of submitted batch jobs')
+JOBS_COMPLETED = Counter('app_jobs_completed_total', 'Number of completed batch jobs')
+JOBS_FAILED = Counter('app_jobs_failed_total', 'Number of batch jobs given up after errors')
+JOBS_DELETED = Counter('app_jobs_deleted_total', 'Number of finished batch jobs deleted after the retention period')
+JOB_ITEMS_PROCESSED = Counter('app_job_items_processed_total', 'Number of processed job items', ['status'])
+JOB_BACKLOG = Gauge('app_job_backlog_items', 'Number of job items waiting to be processed')
+JOB_BATCH_TIME = Histogram('app_job_batch_time_seconds', 'Time spent processing one batch of job items')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    confidence_threshold REAL NOT NULL,
+    max_objects INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    objects TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    def __init__(self, path: str):
+        """
+        Initialize the job store.
+        Opens (or creates) the SQLite database that persists job state.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def create_job(self, urls: List[str], confidence_threshold: float = 0.75, max_objects: Optional[int] = None) -> str:
+        """
+        Persist a new job with all of its items in the pending state.
+
+        Args:
+            urls (List[str]): Image URLs to process
+            confidence_threshold (float): Confidence threshold for filtering predictions
+            max_objects (Optional[int]): Maximum number of objects to return per image
+
+        Returns:
+            str: ID of the created job
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, len(urls), confidence_threshold, max_objects, now, now)
+            )
+            self.conn.executemany(
+                "INSERT INTO job_items (job_id, idx, url, status) VALUES (?, ?, ?, ?)",
+                [(job_id, idx, url, PENDING) for idx, url in enumerate(urls)]
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Get the state and progress of a job.
+
+        Args:
+            job_id (str): ID of the job
+
+        Returns:
+            Optional[Dict]: Job description, or None if the job does not exist
+        """
+        with self.lock:
+            job = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status",
+                (job_id,)
+            ).fetchall())
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "total": job["total"],
+            "completed": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "confidence_threshold": job["confidence_threshold"],
+            "max_objects": job["max_objects"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"]
+        }
+
+    def get_results(self, job_id: str, offset: int = 0) -> List[Dict]:
+        """
+        Get the finished items of a job in submission order.
+        Stops at the first pending item, so offset + len(results) is always
+        the offset to continue from.
+
+        Args:
+            job_id (str): ID of the job
+            offset (int): Index of the first item to return
+
+        Returns:
+            List[Dict]: Results in the same format as batch prediction
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, status, objects, error FROM job_items "
+                "WHERE job_id = ? AND idx >= ? ORDER BY idx",
+                (job_id, offset)
+            ).fetchall()
+        results = []
+        for row in rows:
+            if row["status"] == PENDING:
+                break
+            if row["status"] == DONE:
+                results.append({"url": row["url"], "objects": json.loads(row["objects"])})
+            else:
+                results.append({"url": row["url"], "error": row["error"]})
+        return results
+
+    def pending_items(self, job_id: str) -> List[Dict]:
+        """
+        Get the items of a job that still have to be processed.
+
+        Args:
+            job_id (str): ID of the job
+
+        Returns:
+            List[Dict]: Items with their index and URL
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT idx, url FROM job_items WHERE job_id = ? AND status = ? ORDER BY idx",
+                (job_id, PENDING)
+            ).fetchall()
+        return [{"idx": row["idx"], "url": row["url"]} for row in rows]
+
+    def count_pending(self) -> int:
+        """Count pending items across all jobs"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    def unfinished_jobs(self) -> List[str]:
+        """Get IDs of jobs that are neither completed nor failed, oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at", (COMPLETED, FAILED)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def save_item(self, job_id: str, idx: int, objects: Optional[List[str]] = None, error: Optional[str] = None):
+        """
+        Store the outcome of a single item.
+
+        Args:
+            job_id (str): ID of the job
+            idx (int): Index of the item within the job
+            objects (Optional[List[str]]): Detected object names on success
+            error (Optional[str]): Error message on failure
+        """
+        with self.lock, self.conn:
+            if error is None:
+                self.conn.execute(
+                    "UPDATE job_items SET status = ?, objects = ? WHERE job_id = ? AND idx = ?",
+                    (DONE, json.dumps(objects), job_id, idx)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE job_items SET status = ?, error = ? WHERE job_id = ? AND idx = ?",
+                    (FAILED, error, job_id, idx)
+                )
+            self.conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def set_status(self, job_id: str, status: str):
+        """Update the state of a job"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (status, time.time(), job_id)
+            )
+
+    def fail_job(self, job_id: str, error: str) -> int:
+        """
+        Give up a job: fail its pending items with the error and mark the job FAILED.
+
+        Args:
+            job_id (str): ID of the job
+            error (str): Error message stored for every pending item
+
+        Returns:
+            int: Number of items that were still pending
+        """
+        with self.lock, self.conn:
+            failed = self.conn.execute(
+                "UPDATE job_items SET status = ?, error = ? WHERE job_id = ? AND status = ?",
+                (FAILED, error, job_id, PENDING)
+            ).rowcount
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (FAILED, time.time(), job_id)
+            )
+        return failed
+
+    def delete_finished_jobs(self, before: float) -> int:
+        """
+        Delete completed and failed jobs with their items.
+
+        Args:
+            before (float): Only jobs last updated before this timestamp are deleted
+
+        Returns:
+            int: Number of deleted jobs
+        """
+        with self.lock, self.conn:
+            finished = "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?"
+            params = (COMPLETED, FAILED, before)
+            self.conn.execute(f"DELETE FROM job_items WHERE job_id IN ({finished})", params)
+            return self.conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", params
+            ).rowcount
+
+
+class JobManager:
+    def __init__(self, model, store: JobStore, fetch_image: Callable[[str], ContextManager[Image.Image]],
+                 batch_size: int = 8, budget_retry_interval: float = 1.0, retention: Optional[float] = None,
+                 cleanup_interval: float = 3600.0):
+        """
+        Initialize the job manager.
+        Starts a background worker and re-queues jobs left unfinished by a previous run.
+
+        Args:
+            model: ObjectDetector used for batched inference
+            store (JobStore): Persistent job storage
+            fetch_image (Callable[[str], ContextManager[Image.Image]]): Function that downloads an image by URL;
+                the image is released when its context exits. It must raise ImageRejectedError unchanged,
+                so that items rejected for lack of memory stay pending instead of failing
+            batch_size (int): Number of images passed to the model at once
+            budget_retry_interval (float): Time to wait before fetching again when the image memory
+                budget is used up by other requests
+            retention (Optional[float]): Seconds that finished jobs are kept; kept forever if omitted
+            cleanup_interval (float): Seconds between deletions of expired jobs
+        """
+        self.model = model
+        self.store = store
+        self.fetch_image = fetch_image
+        self.batch_size = batch_size
+        self.budget_retry_interval = budget_retry_interval
+        self.retention = retention
+        self.cleanup_interval = cleanup_interval
+        self.next_cleanup = time.time()
+        self.attempts = {}
+        self.queue = queue.Queue()
+        self.updated = threading.Condition()
+
+        # Pick up work that was interrupted by a restart; finished items are kept
+        for job_id in store.unfinished_jobs():
+            self.queue.put(job_id)
+        JOB_BACKLOG.set(store.count_pending())
+
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, urls: List[str], confidence_threshold: float = 0.75, max_objects: Optional[int] = None) -> Dict:
+        """
+        Create a job and schedule it for background processing.
+
+        Args:
+            urls (List[str]): Image URLs to process
+            confidence_threshold (float): Confidence threshold for filtering predictions
+            max_objects (Optional[int]): Maximum number of objects to return per image
+
+        Returns:
+            Dict: Description of the created job
+        """
+        job_id = self.store.create_job(urls, confidence_threshold, max_objects)
+        JOBS_SUBMITTED.inc()
+        JOB_BACKLOG.inc(len(urls))
+        self.queue.put(job_id)
+        return self.store.get_job(job_id)
+
+    def stream_results(self, job_id: str, offset: int = 0, poll_interval: float = 1.0,
+                       stop: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Yield results of a job as they become available until the job is completed.
+
+        Args:
+            job_id (str): ID of the job
+            offset (int): Index of the first item to return
+            poll_interval (float): Maximum time to wait between checks for new results
+            stop (Optional[threading.Event]): Stop waiting for results once set, e.g. when the client disconnects
+
+        Yields:
+            Dict: Results in the same format as batch prediction
+        """
+        while True:
+            job = self.store.get_job(job_id)
+            if job is None:
+                return
+            results = self.store.get_results(job_id, offset)
+            for result in results:
+                yield result
+            offset += len(results)
+            if job["status"] in (COMPLETED, FAILED) and offset >= job["total"]:
+                return
+            if stop is not None and stop.is_set():
+                return
+            with self.updated:
+                self.updated.wait(poll_interval)
+
+    def _run(self):
+        while True:
+            if self.retention is not None and time.time() >= self.next_cleanup:
+                self._cleanup()
+            try:
+                job_id = self.queue.get(timeout=self.cleanup_interval)
+            except queue.Empty:
+                continue
+            try:
+                self._process_job(job_id)
+                self.attempts.pop(job_id, None)
+            except Exception as e:
+                self._handle_failure(job_id, e)
+            finally:
+                self.queue.task_done()
+
+    def _handle_failure(self, job_id: str, error: Exception):
+        """Re-queue a job whose processing raised, giving it up after MAX_JOB_ATTEMPTS"""
+        attempts = self.attempts.get(job_id, 0) + 1
+        print(f"Job {job_id} failed on attempt {attempts}: {error}")
+        if attempts < MAX_JOB_ATTEMPTS:
+            self.attempts[job_id] = attempts
+            self.queue.put(job_id)
+            return
+        self.attempts.pop(job_id, None)
+        try:
+            failed = self.store.fail_job(job_id, f"Job processing failed: {error}")
+            JOBS_FAILED.inc()
+            JOB_BACKLOG.dec(failed)
+        except Exception as e:
+            print(f"Job {job_id} could not be marked failed: {e}")
+        with self.updated:
+            self.updated.notify_all()
+
+    def _cleanup(self):
+        self.next_cleanup = time.time() + self.cleanup_interval
+        try:
+            JOBS_DELETED.inc(self.store.delete_finished_jobs(time.time() - self.retention))
+        except Exception as e:
+            print(f"Deleting expired jobs failed: {e}")
+
+    def _process_job(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] in (COMPLETED, FAILED):
+            return
+        self.store.set_status(job_id, RUNNING)
+
+        items = self.store.pending_items(job_id)
+        while items:
+            with JOB_BATCH_TIME.time():
+                processed = self._process_batch(job, items[:self.batch_size])
+            items = items[processed:]
+            with self.updated:
+                self.updated.notify_all()
+            if not processed:
+                # Other requests hold the image memory; the item stays pending until it frees up
+                time.sleep(self.budget_retry_interval)
+
+        self.store.set_status(job_id, COMPLETED)
+        JOBS_COMPLETED.inc()
+        with self.updated:
+            self.updated.notify_all()
+
+    def _process_batch(self, job: Dict, items: List[Dict]) -> int:
+        """
+        Download and predict a batch of items and save their outcome.
+
+        Returns:
+            int: Number of leading items that were finished; the others are still pending
+        """
+        images, loaded, errors, outputs = [], [], {}, {}
+        processed = len(items)
+        with contextlib.ExitStack() as stack:
+            # Download images first so that a single bad URL does not fail the whole batch
+            for position, item in enumerate(items):
+                try:
+                    images.append(stack.enter_context(self.fetch_image(item["url"])))
+                    loaded.append(item["idx"])
+                except ImageRejectedError as e:
+                    if e.reason != "budget":
+                        errors[item["idx"]] = str(e)
+                        continue
+                    # Out of memory is temporary, and the images held here may be the cause:
+                    # run the model on them, which releases their memory, and fetch the rest later
+                    processed = position
+                    break
+                except Exception as e:
+                    errors[item["idx"]] = str(e)
+
+            if images:
+                try:
+                    batch_objects = self.model.predict_batch(
+                        images,
+                        confidence_threshold=job["confidence_threshold"],
+                        max_objects=job["max_objects"]
+                    )
+                    outputs = dict(zip(loaded, batch_objects))
+                except Exception as e:
+                    errors.update({idx: str(e) for idx in loaded})
+
+        # Save in submission order so finished items always form a prefix
+        for item in items[:processed]:
+            self._save(job["job_id"], item, objects=outputs.get(item["idx"]), error=errors.get(item["idx"]))
+        return processed
+
+    def _save(self, job_id: str, item: Dict, objects: Optional[List[str]] = None, error: Optional[str] = None):
+        self.store.save_item(job_id, item["idx"], objects=objects, error=error)
+        JOB_ITEMS_PROCESSED.labels(status=FAILED if error is not None else DONE).inc()
+        JOB_BACKLOG.dec()
@@ -0,0 +1,127 @@
+import sys
+from io import BytesIO
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Union
+
+import torch
+from PIL import Image
+
+from server.images import (BYTES_PER_PIXEL, MAX_IMAGE_PIXELS, MemoryBudget, check_pixels, image_budget, open_image,
+                           reserve)
+
+# Segments are named host-wide, so the servers only accept shared memory requests from local clients
+# on their access-restricted Unix domain socket
+
+# Formats of an image in a shared memory segment
+RAW_RGB = "raw_rgb"
+ENCODED = "encoded"
+
+
+def attach(name: str) -> SharedMemory:
+    """
+    Attach to a segment created by a client without taking ownership of it.
+    Before Python 3.13 every attaching process registers the segment with its
+    resource tracker, which would unlink it when the server exits.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    segment = SharedMemory(name=name)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+class SharedImage:
+    """
+    Image read from a client's shared memory segment.
+    For raw RGB, `image` is a zero-copy uint8 CHW tensor over the segment, so callers
+    should only access it through this object and not keep references after close().
+    """
+    def __init__(self, name: str, offset: int, size: int, image_format: str, width: int = 0, height: int = 0,
+                 max_pixels: Optional[int] = None, budget: Optional[MemoryBudget] = None):
+        """
+        Open an image that a co-located client wrote into shared memory.
+
+        Args:
+            name (str): Name of the shared memory segment
+            offset (int): Offset of the image in the segment
+            size (int): Number of bytes of the image
+            image_format (str): RAW_RGB for HxWx3 uint8 pixels, ENCODED for JPEG/PNG/... bytes
+            width (int): Image width, required for RAW_RGB
+            height (int): Image height, required for RAW_RGB
+            max_pixels (Optional[int]): Maximum number of pixels
+            budget (Optional[MemoryBudget]): Budget to reserve memory for the model input from
+        """
+        self.budget = image_budget if budget is None else budget
+        self.reserved = 0
+        self.segment = attach(name)
+        try:
+            if offset < 0 or size <= 0 or offset + size > self.segment.size:
+                raise ValueError(f"Range {offset}+{size} is outside of segment '{name}' of {self.segment.size} bytes")
+            self.image = self._open(offset, size, image_format, width, height,
+                                    MAX_IMAGE_PIXELS if max_pixels is None else max_pixels)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, offset: int, size: int, image_format: str, width: int, height: int,
+              max_pixels: int) -> Union[torch.Tensor, Image.Image]:
+        if image_format == RAW_RGB:
+            if width <= 0 or height <= 0 or width * height * 3 != size:
+                raise ValueError(f"{size} bytes do not hold a {width}x{height} RGB image")
+            check_pixels(width, height, max_pixels)
+            # Only the float copy made by the model's transform needs new memory
+            self._reserve(width * height * (BYTES_PER_PIXEL - 3))
+            pixels = torch.frombuffer(self.segment.buf, dtype=torch.uint8, count=size, offset=offset)
+            return pixels.view(height, width, 3).permute(2, 0, 1)
+
+        if image_format == ENCODED:
+            image = open_image(BytesIO(self.segment.buf[offset:offset + size]))
+            check_pixels(image.width, image.height, max_pixels)
+            self._reserve(image.width * image.height * BYTES_PER_PIXEL)
+            return image.convert('RGB')
+
+        raise ValueError(f"Unknown shared memory image format '{image_format}'")
+
+    def _reserve(self, size: int):
+        reserve(self.budget, size)
+        self.reserved = size
+
+    def close(self):
+        # The tensor view must be gone before the segment can be closed
+        self.image = None
+        if self.reserved:
+            self.budget.release(self.reserved)
+            self.reserved = 0
+        if self.segment is not None:
+            try:
+                self.segment.close()
+            except BufferError:
+                # A traceback still references the tensor; the mapping is released with it
+                pass
+            self.segment = None
+
+    def __enter__(self) -> "SharedImage":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_shared_image(image: Union[Image.Image, bytes], name: Optional[str] = None) -> SharedMemory:
+    """
+    Client-side helper that copies an image into a new shared memory segment.
+    A PIL image is stored as raw RGB pixels, bytes are stored as an encoded image.
+    The caller owns the segment and must close() and unlink() it.
+
+    Args:
+        image (Union[Image.Image, bytes]): Decoded image or encoded image bytes
+        name (Optional[str]): Name of the segment, generated if omitted
+
+    Returns:
+        SharedMemory: Segment holding the image at offset 0
+    """
+    data = image.convert('RGB').tobytes() if isinstance(image, Image.Image) else image
+    segment = SharedMemory(name=name, create=True, size=len(data))
+    segment.buf[:len(data)] = data
+    return segment
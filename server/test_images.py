@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.images import fetch_image, ImageRejectedError, MemoryBudget, BYTES_PER_PIXEL
+
+def encode_image(width: int, height: int, mode: str = 'RGB') -> bytes:
+    """Helper function to encode a test image as PNG"""
+    buffer = BytesIO()
+    Image.new(mode, (width, height)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+IMAGES = {
+    "/small.png": encode_image(32, 24),
+    "/rgba.png": encode_image(16, 16, 'RGBA'),
+    "/wide.png": encode_image(4000, 10),
+}
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves IMAGES; paths starting with /chunked omit Content-Length"""
+    def do_GET(self):
+        chunked = self.path.startswith("/chunked")
+        data = IMAGES.get(self.path.replace("/chunked", "", 1))
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if chunked:
+            self.send_header("Connection", "close")
+        else:
+            self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def start_image_server() -> str:
+    """Helper function to start a local image server and return its base URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+BASE_URL = start_image_server()
+
+def expect_rejection(reason: str, url: str, **limits):
+    """Helper function to check that an image is rejected for the given reason"""
+    try:
+        fetch_image(url, **limits)
+    except ImageRejectedError as e:
+        assert e.reason == reason, f"Expected rejection by {reason}, got {e.reason}"
+        return
+    raise AssertionError(f"{url} should be rejected by {reason}")
+
+def test_fetch_image():
+    """Test that images are decoded to RGB and release their reservation"""
+    print("\n=== Testing image fetching ===")
+    budget = MemoryBudget(10 * 1024 * 1024)
+    with fetch_image(f"{BASE_URL}/rgba.png", budget=budget) as image:
+        assert image.mode == 'RGB'
+        assert image.size == (16, 16)
+        assert budget.used == 16 * 16 * BYTES_PER_PIXEL, "Encoded bytes should be released after decoding"
+    assert budget.used == 0, "Memory should be released after the image is closed"
+
+def test_byte_limit():
+    """Test that oversized downloads are rejected with and without Content-Length"""
+    print("\n=== Testing byte limit ===")
+    max_bytes = len(IMAGES["/small.png"]) - 1
+    expect_rejection("bytes", f"{BASE_URL}/small.png", max_bytes=max_bytes)
+    expect_rejection("bytes", f"{BASE_URL}/chunked/small.png", max_bytes=max_bytes)
+
+def test_pixel_limit():
+    """Test that images with too many pixels are rejected before decoding"""
+    print("\n=== Testing pixel limit ===")
+    expect_rejection("pixels", f"{BASE_URL}/wide.png", max_pixels=39999)
+    fetch_image(f"{BASE_URL}/wide.png", max_pixels=40000).close()
+
+def test_memory_budget():
+    """Test that images are rejected while the budget is held by other requests"""
+    print("\n=== Testing memory budget ===")
+    budget = MemoryBudget(32 * 24 * BYTES_PER_PIXEL + len(IMAGES["/small.png"]), timeout=0.1)
+    held = fetch_image(f"{BASE_URL}/small.png", budget=budget)
+    expect_rejection("budget", f"{BASE_URL}/small.png", budget=budget)
+    # Without Content-Length the byte limit is reserved before downloading
+    expect_rejection("budget", f"{BASE_URL}/chunked/small.png", budget=budget,
+                     max_bytes=len(IMAGES["/small.png"]) + 1)
+    assert budget.used == 32 * 24 * BYTES_PER_PIXEL
+    held.close()
+    fetch_image(f"{BASE_URL}/small.png", budget=budget).close()
+    assert budget.used == 0
+    # An image larger than the whole budget can never be accepted, so it is not a temporary rejection
+    expect_rejection("too_large", f"{BASE_URL}/wide.png", budget=budget)
+
+def run_all_tests():
+    """Run all test functions"""
+    test_fetch_image()
+    test_byte_limit()
+    test_pixel_limit()
+    test_memory_budget()
+    print("\n=== All tests completed successfully ===")
+
+if __name__ == "__main__":
+    run_all_tests()
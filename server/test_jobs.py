@@ -0,0 +1,171 @@
+import contextlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.jobs import JobStore, JobManager, COMPLETED, FAILED, MAX_JOB_ATTEMPTS
+from server.images import ImageRejectedError, MemoryBudget
+
+class FakeModel:
+    """Model stub that reports the width of each image as its only object"""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, images, confidence_threshold=0.75, max_objects=None):
+        self.batch_sizes.append(len(images))
+        return [[f"width-{image.width}"] for image in images]
+
+@contextlib.contextmanager
+def fake_fetch(url: str):
+    """Helper function that builds an image from its URL instead of downloading it"""
+    if "bad" in url:
+        raise ValueError(f"Failed to download image: {url}")
+    yield Image.new('RGB', (int(url.rsplit('/', 1)[-1]), 8))
+
+def wait_for_job(manager: JobManager, job_id: str, timeout: float = 5.0) -> dict:
+    """Helper function to wait until a job is completed"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.store.get_job(job_id)
+        if job["status"] == COMPLETED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not complete in {timeout} seconds")
+
+def test_job_processing():
+    """Test that a job is processed in batches and keeps per-item errors"""
+    print("\n=== Testing job processing ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        model = FakeModel()
+        manager = JobManager(model, JobStore(os.path.join(tmp, "jobs.db")), fake_fetch, batch_size=2)
+        urls = ["http://img/10", "http://bad/1", "http://img/20", "http://img/30"]
+        job = manager.submit(urls)
+        job = wait_for_job(manager, job["job_id"])
+        results = manager.store.get_results(job["job_id"])
+        print("Results:", results)
+        assert job["completed"] == 3 and job["failed"] == 1
+        assert [r["url"] for r in results] == urls, "Results should keep submission order"
+        assert results[0]["objects"] == ["width-10"]
+        assert "error" in results[1]
+        assert model.batch_sizes == [1, 2], "Images should be passed to the model in batches"
+
+def test_stream_results():
+    """Test streaming results with an offset"""
+    print("\n=== Testing result streaming ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = JobManager(FakeModel(), JobStore(os.path.join(tmp, "jobs.db")), fake_fetch)
+        job = manager.submit([f"http://img/{i}" for i in range(1, 6)])
+        streamed = list(manager.stream_results(job["job_id"], offset=2, poll_interval=0.05))
+        assert [r["objects"] for r in streamed] == [["width-3"], ["width-4"], ["width-5"]]
+
+        # A stream of a job that never finishes ends once it is stopped, e.g. after a disconnect
+        stop = threading.Event()
+        unfinished = manager.store.create_job(["http://img/1"])
+        stop.set()
+        start_time = time.time()
+        assert list(manager.stream_results(unfinished, poll_interval=5, stop=stop)) == []
+        assert time.time() - start_time < 1
+
+def test_resume_after_restart():
+    """Test that unfinished jobs are resumed and finished items are not recomputed"""
+    print("\n=== Testing job recovery ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+        store = JobStore(path)
+        job_id = store.create_job(["http://img/1", "http://img/2", "http://img/3"])
+        store.save_item(job_id, 0, objects=["kept"])
+
+        model = FakeModel()
+        manager = JobManager(model, JobStore(path), fake_fetch)
+        job = wait_for_job(manager, job_id)
+        results = manager.store.get_results(job_id)
+        assert job["completed"] == 3
+        assert results[0]["objects"] == ["kept"], "Finished items should survive a restart"
+        assert model.batch_sizes == [2], "Only pending items should be processed"
+
+def test_budget_rejection():
+    """Test that items rejected for lack of memory stay pending instead of failing"""
+    print("\n=== Testing memory budget in jobs ===")
+    budget = MemoryBudget(25, timeout=0.05)
+
+    @contextlib.contextmanager
+    def budget_fetch(url: str):
+        width = int(url.rsplit('/', 1)[-1])
+        if not budget.acquire(width):
+            raise ImageRejectedError("Server is out of memory for images, retry later", "budget")
+        try:
+            yield Image.new('RGB', (width, 8))
+        finally:
+            budget.release(width)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = FakeModel()
+        manager = JobManager(model, JobStore(os.path.join(tmp, "jobs.db")), budget_fetch, batch_size=4,
+                             budget_retry_interval=0.05)
+        # Memory held by another request is released while the job waits for it
+        budget.acquire(20)
+        job = manager.submit(["http://img/10"] * 5)
+        time.sleep(0.2)
+        assert manager.store.get_job(job["job_id"])["failed"] == 0
+        budget.release(20)
+
+        job = wait_for_job(manager, job["job_id"])
+        assert job["completed"] == 5 and job["failed"] == 0
+        # Only two images fit at once, so batches are sent as soon as the budget runs out
+        assert model.batch_sizes == [2, 2, 1]
+
+class BrokenStore(JobStore):
+    """Job store whose writes of results fail, like a database that ran out of disk space"""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.save_attempts = 0
+
+    def save_item(self, *args, **kwargs):
+        self.save_attempts += 1
+        raise sqlite3.OperationalError("database or disk is full")
+
+def test_job_failure():
+    """Test that a job whose processing keeps raising is retried, then failed instead of left running"""
+    print("\n=== Testing job failure ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BrokenStore(os.path.join(tmp, "jobs.db"))
+        manager = JobManager(FakeModel(), store, fake_fetch)
+        job = manager.submit(["http://img/1", "http://img/2"])
+        streamed = list(manager.stream_results(job["job_id"], poll_interval=0.05))
+        job = store.get_job(job["job_id"])
+        print("Job:", job)
+        assert job["status"] == FAILED and job["failed"] == 2
+        assert store.save_attempts == MAX_JOB_ATTEMPTS
+        assert all("database or disk is full" in result["error"] for result in streamed)
+
+def test_job_retention():
+    """Test that only finished jobs older than the retention period are deleted"""
+    print("\n=== Testing job retention ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "jobs.db"))
+        finished = store.create_job(["http://img/1"])
+        store.save_item(finished, 0, objects=["kept"])
+        store.set_status(finished, COMPLETED)
+        unfinished = store.create_job(["http://img/2"])
+        assert store.delete_finished_jobs(before=time.time() - 60) == 0
+        assert store.delete_finished_jobs(before=time.time() + 1) == 1
+        assert store.get_job(finished) is None and store.get_results(finished) == []
+        assert store.get_job(unfinished) is not None, "Unfinished jobs should never be deleted"
+
+def run_all_tests():
+    """Run all test functions"""
+    test_job_processing()
+    test_stream_results()
+    test_resume_after_restart()
+    test_budget_rejection()
+    test_job_failure()
+    test_job_retention()
+    print("\n=== All tests completed successfully ===")
+
+if __name__ == "__main__":
+    run_all_tests()
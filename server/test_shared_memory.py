@@ -0,0 +1,121 @@
+import os
+import sys
+from io import BytesIO
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.images import ImageRejectedError, MemoryBudget, BYTES_PER_PIXEL
+from server.shared_memory import SharedImage, write_shared_image, ENCODED, RAW_RGB
+
+def gradient_image(width: int, height: int) -> Image.Image:
+    """Helper function to create an image whose pixels differ in every channel"""
+    image = Image.new('RGB', (width, height))
+    image.putdata([(x, y, x + y) for y in range(height) for x in range(width)])
+    return image
+
+def test_raw_rgb():
+    """Test that raw pixels are exposed as a CHW tensor over the segment without copying"""
+    print("\n=== Testing raw RGB shared memory image ===")
+    image = gradient_image(8, 6)
+    segment = write_shared_image(image)
+    budget = MemoryBudget(capacity=10**6)
+    try:
+        with SharedImage(segment.name, 0, 8 * 6 * 3, RAW_RGB, width=8, height=6, budget=budget) as shared:
+            assert tuple(shared.image.shape) == (3, 6, 8)
+            assert shared.image[:, 2, 5].tolist() == [5, 2, 7]
+            assert budget.used == 8 * 6 * (BYTES_PER_PIXEL - 3)
+            # Writes by the client are visible, so the tensor shares the segment's memory
+            segment.buf[0] = 200
+            assert shared.image[0, 0, 0].item() == 200
+        assert budget.used == 0, "Reservation should be released on close"
+    finally:
+        segment.close()
+        segment.unlink()
+
+def test_encoded():
+    """Test that encoded images are decoded from the segment"""
+    print("\n=== Testing encoded shared memory image ===")
+    buffer = BytesIO()
+    gradient_image(8, 6).save(buffer, 'PNG')
+    data = buffer.getvalue()
+    # Store the image after some padding to check offsets
+    segment = write_shared_image(b"\0" * 16 + data)
+    try:
+        with SharedImage(segment.name, 16, len(data), ENCODED, budget=MemoryBudget(capacity=10**6)) as shared:
+            assert shared.image.size == (8, 6)
+            assert shared.image.getpixel((5, 2)) == (5, 2, 7)
+    finally:
+        segment.close()
+        segment.unlink()
+
+def test_invalid_requests():
+    """Test that handles outside of the segment, non-images and oversized images are rejected"""
+    print("\n=== Testing invalid shared memory requests ===")
+    segment = write_shared_image(gradient_image(8, 6))
+    # A 1-bit PNG is small, but decodes to more than twice the pixel limit
+    buffer = BytesIO()
+    Image.new('1', (9000, 9000)).save(buffer, 'PNG')
+    bomb = write_shared_image(buffer.getvalue())
+    budget = MemoryBudget(capacity=10**6, timeout=0.1)
+    try:
+        invalid = [
+            dict(offset=0, size=8 * 6 * 3 + 1, image_format=RAW_RGB, width=8, height=6),
+            dict(offset=-1, size=10, image_format=ENCODED),
+            dict(offset=0, size=8 * 6 * 3, image_format=RAW_RGB, width=6, height=6),
+            dict(offset=0, size=8 * 6 * 3, image_format="bmp"),
+            # Raw pixels are not an encoded image
+            dict(offset=0, size=8 * 6 * 3, image_format=ENCODED),
+        ]
+        for kwargs in invalid:
+            try:
+                SharedImage(segment.name, budget=budget, **kwargs)
+            except ValueError:
+                continue
+            raise AssertionError(f"{kwargs} should be rejected")
+
+        try:
+            SharedImage(segment.name, 0, 8 * 6 * 3, RAW_RGB, width=8, height=6, max_pixels=40, budget=budget)
+            raise AssertionError("Image over the pixel limit should be rejected")
+        except ImageRejectedError as e:
+            assert e.reason == "pixels"
+
+        try:
+            SharedImage(bomb.name, 0, bomb.size, ENCODED, budget=budget)
+            raise AssertionError("Decompression bomb should be rejected")
+        except ImageRejectedError as e:
+            assert e.reason == "pixels"
+
+        full = MemoryBudget(8 * 6 * (BYTES_PER_PIXEL - 3), 0.1)
+        full.acquire(1)
+        try:
+            SharedImage(segment.name, 0, 8 * 6 * 3, RAW_RGB, width=8, height=6, budget=full)
+            raise AssertionError("Image should be rejected while the memory budget is in use")
+        except ImageRejectedError as e:
+            assert e.reason == "budget"
+
+        try:
+            SharedImage(segment.name, 0, 8 * 6 * 3, RAW_RGB, width=8, height=6, budget=MemoryBudget(100, 0.1))
+            raise AssertionError("Image larger than the whole memory budget should be rejected")
+        except ImageRejectedError as e:
+            assert e.reason == "too_large", "An image that can never fit is not a temporary rejection"
+        assert budget.used == 0
+
+        try:
+            SharedImage("missing_segment", 0, 10, ENCODED)
+            raise AssertionError("Missing segment should be rejected")
+        except FileNotFoundError:
+            pass
+    finally:
+        for shared in (segment, bomb):
+            shared.close()
+            shared.unlink()
+
+def run_all_tests():
+    """Run all test functions"""
+    test_raw_rgb()
+    test_encoded()
+    test_invalid_requests()
+    print("\n=== All tests completed successfully ===")
+
+if __name__ == "__main__":
+    run_all_tests()